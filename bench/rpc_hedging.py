@@ -0,0 +1,93 @@
+# Read latency through the RPC router against two local stub nodes, with
+# hedging on and off. The preferred node is fast but stalls on a few
+# requests, the other is steady but slower, so only the tail should move.
+#
+#   python -m bench.rpc_hedging > bench_output.txt
+import asyncio
+import random
+import statistics
+import time
+
+from aiohttp import web
+from web3.types import RPCEndpoint
+
+from bot.config import rpc_hedge_delay
+from bot.utils import rpc_router
+from bot.utils.http import close_session
+
+REQUESTS = 400
+
+CONCURRENCY = 8
+
+# (base delay, share of stalled requests, stall delay) per node
+NODES = {
+    18601: (0.02, 0.03, 1.0),
+    18602: (0.06, 0.0, 0.0),
+}
+
+
+def stub_node(delay: float, stall_rate: float, stall: float, seed: int):
+    rng = random.Random(seed)
+
+    async def handle(request: web.Request) -> web.Response:
+        body = await request.json()
+        await asyncio.sleep(stall if rng.random() < stall_rate else delay)
+        if isinstance(body, list):
+            return web.json_response(
+                [{"jsonrpc": "2.0", "id": item["id"], "result": "0x1"} for item in body]
+            )
+        return web.json_response({"jsonrpc": "2.0", "id": body["id"], "result": "0x1"})
+
+    app = web.Application()
+    app.router.add_post("/", handle)
+    return app
+
+
+async def start_nodes() -> list:
+    runners = []
+    for port, (delay, stall_rate, stall) in NODES.items():
+        runner = web.AppRunner(stub_node(delay, stall_rate, stall, port))
+        await runner.setup()
+        await web.TCPSite(runner, "127.0.0.1", port).start()
+        runners.append(runner)
+    return runners
+
+
+async def run(hedged: bool) -> None:
+    rpc_router.rpc_hedge_fanout = 2 if hedged else 1
+    provider = rpc_router.RoutedHTTPProvider(
+        1, [f"http://127.0.0.1:{port}/" for port in NODES]
+    )
+    latencies = []
+
+    async def worker(count: int) -> None:
+        for _ in range(count):
+            started = time.perf_counter()
+            await provider.make_request(RPCEndpoint("eth_blockNumber"), [])
+            latencies.append(time.perf_counter() - started)
+
+    await asyncio.gather(*(worker(REQUESTS // CONCURRENCY) for _ in range(CONCURRENCY)))
+
+    latencies.sort()
+    print(
+        f"hedging {'on ' if hedged else 'off'}  "
+        f"p50 {statistics.median(latencies) * 1000:.0f}ms "
+        f"p99 {latencies[int(len(latencies) * 0.99)] * 1000:.0f}ms "
+        f"max {latencies[-1] * 1000:.0f}ms"
+    )
+
+
+async def main() -> None:
+    runners = await start_nodes()
+    print(f"hedge delay {rpc_hedge_delay * 1000:.0f}ms")
+    try:
+        for hedged in (False, True):
+            await run(hedged)
+    finally:
+        await close_session()
+        for runner in runners:
+            await runner.cleanup()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,75 @@
+# Event loop lag while signing 300 transactions concurrently, inline on the
+# loop versus through the signing thread and process pools.
+#
+#   python -m bench.signing > bench_output.txt
+#
+# Needs the bot's environment variables (FERNET_KEY and friends) set, since
+# bot.utils.signer reads them on import.
+import asyncio
+import time
+
+from eth_account import Account
+
+from bot.utils import signer
+
+SIGNATURES = 300
+
+account = Account.create()
+transaction = {
+    "to": account.address,
+    "value": 1,
+    "gas": 21000,
+    "gasPrice": 10**9,
+    "nonce": 0,
+    "chainId": 1,
+    "data": "0x" + "ab" * 2000,
+}
+
+
+async def measure_lag(stop: asyncio.Event, lags: list) -> None:
+    while not stop.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(0.001)
+        lags.append(time.perf_counter() - started - 0.001)
+
+
+async def sign_inline() -> None:
+    account.sign_transaction(transaction)
+    await asyncio.sleep(0)
+
+
+async def sign_in_pool() -> None:
+    await signer.sign_transaction(account, transaction)
+
+
+async def run(mode: str) -> None:
+    lags = []
+    stop = asyncio.Event()
+    probe = asyncio.create_task(measure_lag(stop, lags))
+    await asyncio.sleep(0.01)
+
+    sign = sign_inline if mode == "inline" else sign_in_pool
+    started = time.perf_counter()
+    await asyncio.gather(*(sign() for _ in range(SIGNATURES)))
+    total = time.perf_counter() - started
+    stop.set()
+    await probe
+
+    lags.sort()
+    print(
+        f"{mode:8s} total {total:.2f}s  "
+        f"loop lag max {lags[-1] * 1000:.1f}ms "
+        f"p99 {lags[int(len(lags) * 0.99)] * 1000:.1f}ms"
+    )
+
+
+async def main() -> None:
+    await run("inline")
+    for mode in ("thread", "process"):
+        signer.signing_executor = mode
+        await run(mode)
+        signer.shutdown_signing_executor()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
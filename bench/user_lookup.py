@@ -0,0 +1,88 @@
+# Median user lookup time as the user's trade history grows, loading the
+# history along with the user versus loading the user and wallets only.
+#
+#   python -m bench.user_lookup > bench_output.txt
+#
+# Runs on an in-memory SQLite database (needs aiosqlite); the bot's
+# environment variables must be set since bot.db.queries reads them on
+# import.
+import asyncio
+import statistics
+import time
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import selectinload
+
+from bot.db.models import Base, EVMSwap, EVMWallet, TONWallet, User
+from bot.db.queries import get_user_model
+
+HISTORY_SIZES = (0, 100, 1000, 10000)
+
+LOOKUPS = 20
+
+
+# what every lookup cost while the history relationships were lazy="selectin"
+async def get_user_with_history(db: AsyncSession, user_id: int) -> User:
+    return (
+        await db.execute(
+            select(User)
+            .where(User.id == user_id)
+            .options(
+                selectinload(User.evm_swaps),
+                selectinload(User.evm_limit_orders),
+                selectinload(User.evm_crosschain_swaps),
+                selectinload(User.ton_swaps),
+            )
+        )
+    ).scalar_one()
+
+
+async def time_lookups(session_pool: async_sessionmaker, lookup) -> float:
+    times = []
+    for _ in range(LOOKUPS):
+        async with session_pool() as db:
+            started = time.perf_counter()
+            user = await lookup(db, 1)
+            user.evm_wallet.address
+            times.append(time.perf_counter() - started)
+    return statistics.median(times) * 1000
+
+
+async def main() -> None:
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    session_pool = async_sessionmaker(engine, expire_on_commit=False)
+
+    async with session_pool() as db:
+        db.add(User(id=1))
+        db.add(EVMWallet(user_id=1, encrypted_private_key="x", address="0x1"))
+        db.add(TONWallet(user_id=1, encrypted_mnemonic="x", address="ton"))
+        await db.commit()
+
+    print(f"{'history rows':>12} {'with history':>14} {'user only':>10}")
+    rows = 0
+    for size in HISTORY_SIZES:
+        async with session_pool() as db:
+            db.add_all(
+                EVMSwap(
+                    user_id=1,
+                    chain_id=1,
+                    amount=1,
+                    from_token="a",
+                    to_token="b",
+                    tx_hash="h",
+                )
+                for _ in range(size - rows)
+            )
+            await db.commit()
+        rows = size
+
+        eager = await time_lookups(session_pool, get_user_with_history)
+        lean = await time_lookups(session_pool, get_user_model)
+        print(f"{size:>12} {eager:>11.1f} ms {lean:>7.1f} ms")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -1,8 +1,27 @@
-from typing import Any, Awaitable, Callable, Dict
+from typing import Any, Awaitable, Callable, Dict, Optional
 
 from aiogram import BaseMiddleware
 from aiogram.types import TelegramObject
-from sqlalchemy.ext.asyncio import async_sessionmaker
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+
+class LazySession:
+    def __init__(self, session_pool: async_sessionmaker):
+        self._session_pool = session_pool
+        self._session: Optional[AsyncSession] = None
+
+    @property
+    def session(self) -> AsyncSession:
+        if self._session is None:
+            self._session = self._session_pool()
+        return self._session
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.session, name)
+
+    async def close(self) -> None:
+        if self._session is not None:
+            await self._session.close()
 
 
 class DbSessionMiddleware(BaseMiddleware):
@@ -16,6 +35,9 @@ class DbSessionMiddleware(BaseMiddleware):
         event: TelegramObject,
         data: Dict[str, Any],
     ) -> Any:
-        async with self.session_pool() as session:
-            data["db"] = session
+        session = LazySession(self.session_pool)
+        data["db"] = session
+        try:
             return await handler(event, data)
+        finally:
+            await session.close()
@@ -8,14 +8,22 @@ from aiogram.enums import ParseMode
 from aiogram.fsm.storage.redis import RedisStorage
 from aiogram.utils.callback_answer import CallbackAnswerMiddleware
 
-from bot.db.database import async_session, engine
-from bot.db.models import Base
+from bot.db.database import async_session
+from bot.db.journal import run_journal_flusher
+from bot.db.partitions import run_partition_maintenance
+from bot.db.wallet_pool import run_wallet_pool_filler
 from bot.env import REDIS_URL, TOKEN
 from bot.handlers import menuHD
 from bot.handlers.EVM import EVMcrosschainHD, EVMlimitHD, EVMswapHD, EVMwithdrawHD
 from bot.handlers.TON import TONnftHD, TONswapHD, TONwithdrawHD
 from bot.Middlewares.dbMD import DbSessionMiddleware
 from bot.Middlewares.FloodMD import FloodMiddleware
+from bot.utils.cache import run_cache_invalidation_listener
+from bot.utils.http import close_session, get_session
+from bot.utils.providers import init_providers, monitor_providers
+from bot.utils.signer import shutdown_signing_executor
+from bot.utils.token_registry import load_token_registry, run_token_registry_refresh
+from bot.utils.wallet_generator import shutdown_wallet_executor
 
 logging.basicConfig(
     level=logging.DEBUG,
@@ -36,8 +44,6 @@ async def main() -> None:
     )
     
     async with bot:
-        async with engine.begin() as conn:
-            await conn.run_sync(Base.metadata.create_all)
         dp = Dispatcher(storage=storage)
 
         dp.message.filter(F.chat.type == "private")
@@ -58,8 +64,29 @@ async def main() -> None:
         dp.include_router(TONnftHD.router)
         dp.include_router(TONwithdrawHD.router)
 
+        get_session()
+        await init_providers()
+        await load_token_registry()
+        provider_monitor = asyncio.create_task(monitor_providers())
+        journal_flusher = asyncio.create_task(run_journal_flusher())
+        partition_maintenance = asyncio.create_task(run_partition_maintenance())
+        wallet_pool_filler = asyncio.create_task(run_wallet_pool_filler())
+        token_registry_refresh = asyncio.create_task(run_token_registry_refresh())
+        cache_invalidation = asyncio.create_task(run_cache_invalidation_listener())
+
         logger.info("Bot started successfully!")
-        await dp.start_polling(bot, allowed_updates=dp.resolve_used_update_types())
+        try:
+            await dp.start_polling(bot, allowed_updates=dp.resolve_used_update_types())
+        finally:
+            provider_monitor.cancel()
+            journal_flusher.cancel()
+            partition_maintenance.cancel()
+            wallet_pool_filler.cancel()
+            token_registry_refresh.cancel()
+            cache_invalidation.cancel()
+            shutdown_signing_executor()
+            shutdown_wallet_executor()
+            await close_session()
     logger.info("Bot stopped.")
 
 
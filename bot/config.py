@@ -4,6 +4,20 @@ bot_name = "swappy_web3_bot"
 
 api_base_url = "https://web3.okx.com/api/v5/dex"
 
+okx_requests_per_second = 5
+
+okx_burst = 5
+
+okx_max_retries = 3
+
+okx_retry_backoff = 0.5
+
+quote_ttl = 5
+
+quote_cache_size = 2000
+
+quote_amount_precision = 3
+
 
 evm_native_coin = "0xeeeeeeeeeeeeeeeeeeeeeeeeeeeeeeeeeeeeeeee"
 
@@ -14,6 +28,121 @@ ZERO_ADDRESS = "0x0000000000000000000000000000000000000000"
 
 gas_ratio = 2.5
 
+nonce_ttl = 120
+
+# how often the nonce counter is checked against the chain's pending count
+nonce_resync_interval = 30
+
+signer_cache_size = 1000
+
+signer_cache_ttl = 300
+
+# "thread" or "process"
+signing_executor = "thread"
+
+signing_workers = 4
+
+# per namespace: ttl, seconds a stale value is still served while it refreshes,
+# seconds a failure or empty result is remembered, and the L1 budget in bytes
+cache_settings = {
+    "balance": dict(ttl=10, negative_ttl=3, max_bytes=2 << 20),
+    "ton_account": dict(ttl=10, negative_ttl=3, max_bytes=1 << 20),
+    "jetton_balance": dict(ttl=10, stale_ttl=5, negative_ttl=5, max_bytes=1 << 20),
+    "erc20_balances": dict(ttl=20, stale_ttl=10, negative_ttl=5, max_bytes=8 << 20),
+    "jetton_balances": dict(ttl=20, stale_ttl=10, negative_ttl=5, max_bytes=8 << 20),
+    "decimals": dict(ttl=864000, negative_ttl=60, max_bytes=2 << 20),
+    "token_name": dict(ttl=864000, negative_ttl=60, max_bytes=2 << 20),
+    "jetton_decimals": dict(ttl=864000, negative_ttl=60, max_bytes=1 << 20),
+    # a user who is not found is about to register, so misses are not kept
+    "user": dict(ttl=86400, max_bytes=8 << 20),
+}
+
+# how long to wait for a trade to land before refreshing balances anyway
+balance_refresh_timeout = 120
+
+# balances fetched right after a trade may come from a provider that has not
+# indexed it yet, so they are cached for a short while only
+balance_prefetch_ttl = 3
+
+ton_tx_poll_interval = 3
+
+journal_batch_size = 500
+
+journal_block_ms = 1000
+
+journal_claim_idle_ms = 60_000
+
+journal_claim_interval = 60
+
+journal_retry_delay = 5
+
+partition_months_ahead = 3
+
+# partitions whose whole month is older than this are detached and archived
+partition_retention_months = 12
+
+partition_archive_dir = "archive"
+
+partition_maintenance_interval = 6 * 3600
+
+wallet_pool_size = 200
+
+wallet_pool_batch_size = 20
+
+wallet_pool_refill_interval = 30
+
+wallet_generation_workers = 2
+
+token_registry_refresh_interval = 24 * 3600
+
+
+http_pool_limit = 200
+
+http_pool_limit_per_host = 50
+
+http_keepalive_timeout = 60
+
+http_dns_cache_ttl = 300
+
+http_timeout = 30
+
+
+rpc_health_interval = 10
+
+rpc_health_timeout = 5
+
+rpc_request_timeout = 15
+
+rpc_hedge_delay = 0.25
+
+rpc_hedge_fanout = 2
+
+rpc_latency_ewma_alpha = 0.3
+
+rpc_max_cooldown = 60
+
+rpc_batch_window = 0.01
+
+rpc_batch_max_size = 20
+
+rpc_read_methods = {
+    "eth_blockNumber",
+    "eth_call",
+    "eth_chainId",
+    "eth_estimateGas",
+    "eth_gasPrice",
+    "eth_getBalance",
+    "eth_getTransactionCount",
+    "eth_getTransactionReceipt",
+}
+
+portfolio_timeout = 5
+
+# concurrent requests per provider; every chain's RPC counts as its own provider
+portfolio_concurrency = {"rpc": 4, "moralis": 4, "toncenter": 2}
+
+portfolio_tokens_per_chain = 10
+
 
 chain_id_to_name = {
     1: "eth",
@@ -35,14 +164,42 @@ chain_id_to_native_token_name = {
     8453: "ETH",
 }
 
-chain_id_to_rpc_url = {
-    1: "https://eth.drpc.org",
-    10: "https://optimism.drpc.org",
-    56: "https://bsc.drpc.org",
-    137: "https://polygon.drpc.org",
-    42161: "https://arbitrum.drpc.org",
-    43114: "https://avalanche.drpc.org",
-    8453: "https://base.drpc.org",
+chain_id_to_rpc_urls = {
+    1: [
+        "https://eth.drpc.org",
+        "https://ethereum-rpc.publicnode.com",
+        "https://1rpc.io/eth",
+    ],
+    10: [
+        "https://optimism.drpc.org",
+        "https://optimism-rpc.publicnode.com",
+        "https://mainnet.optimism.io",
+    ],
+    56: [
+        "https://bsc.drpc.org",
+        "https://bsc-rpc.publicnode.com",
+        "https://bsc-dataseed.bnbchain.org",
+    ],
+    137: [
+        "https://polygon.drpc.org",
+        "https://polygon-bor-rpc.publicnode.com",
+        "https://polygon-rpc.com",
+    ],
+    42161: [
+        "https://arbitrum.drpc.org",
+        "https://arbitrum-one-rpc.publicnode.com",
+        "https://arb1.arbitrum.io/rpc",
+    ],
+    43114: [
+        "https://avalanche.drpc.org",
+        "https://avalanche-c-chain-rpc.publicnode.com",
+        "https://api.avax.network/ext/bc/C/rpc",
+    ],
+    8453: [
+        "https://base.drpc.org",
+        "https://base-rpc.publicnode.com",
+        "https://mainnet.base.org",
+    ],
 }
 
 chain_id_to_tx_scan_url = {
@@ -209,3 +366,39 @@ cancel_limit_abi = [
         "type": "function",
     }
 ]
+
+
+multicall3_address = "0xcA11bde05977b3631167028862bE2a173976CA11"
+
+multicall_chunk_size = 300
+
+multicall3_abi = [
+    {
+        "inputs": [
+            {
+                "components": [
+                    {"internalType": "address", "name": "target", "type": "address"},
+                    {"internalType": "bool", "name": "allowFailure", "type": "bool"},
+                    {"internalType": "bytes", "name": "callData", "type": "bytes"},
+                ],
+                "internalType": "struct Multicall3.Call3[]",
+                "name": "calls",
+                "type": "tuple[]",
+            }
+        ],
+        "name": "aggregate3",
+        "outputs": [
+            {
+                "components": [
+                    {"internalType": "bool", "name": "success", "type": "bool"},
+                    {"internalType": "bytes", "name": "returnData", "type": "bytes"},
+                ],
+                "internalType": "struct Multicall3.Result[]",
+                "name": "returnData",
+                "type": "tuple[]",
+            }
+        ],
+        "stateMutability": "payable",
+        "type": "function",
+    }
+]
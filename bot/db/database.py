@@ -1,9 +1,12 @@
+import random
+
+from sqlalchemy import Select
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session
 
-from bot.env import DATABASE_URL
+from bot.env import DATABASE_REPLICA_URLS, DATABASE_URL
 
-engine = create_async_engine(
-    DATABASE_URL,
+engine_options = dict(
     echo=True,
     future=True,
     isolation_level="READ COMMITTED",
@@ -15,7 +18,36 @@ engine = create_async_engine(
     pool_use_lifo=True,
 )
 
-async_session = async_sessionmaker(engine, expire_on_commit=False, class_=AsyncSession)
+engine = create_async_engine(DATABASE_URL, **engine_options)
+
+replica_engines = [
+    create_async_engine(url, **engine_options) for url in DATABASE_REPLICA_URLS
+]
+
+
+class RoutingSession(Session):
+    # plain selects go to a replica; writes, FOR UPDATE and anything else go to
+    # the primary, and once a session has touched the primary it stays there
+    # so it reads its own writes
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.sticky_primary = False
+
+    def get_bind(self, mapper=None, clause=None, primary=False, **kw):
+        if (
+            replica_engines
+            and not (primary or self.sticky_primary or self._flushing)
+            and isinstance(clause, Select)
+            and clause._for_update_arg is None
+        ):
+            return random.choice(replica_engines).sync_engine
+        self.sticky_primary = True
+        return engine.sync_engine
+
+
+async_session = async_sessionmaker(
+    expire_on_commit=False, class_=AsyncSession, sync_session_class=RoutingSession
+)
 
 # async def get_db():
 #     async with async_session() as session:
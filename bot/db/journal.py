@@ -0,0 +1,205 @@
+import asyncio
+import json
+import logging
+import socket
+import time
+import uuid
+from collections import defaultdict
+from datetime import datetime, timezone
+from decimal import Decimal
+
+from redis.asyncio import Redis
+from sqlalchemy import DateTime, Numeric, Uuid, inspect
+from sqlalchemy.exc import DataError, IntegrityError
+from sqlalchemy.dialects.postgresql import insert
+
+from bot.config import (
+    journal_batch_size,
+    journal_block_ms,
+    journal_claim_idle_ms,
+    journal_claim_interval,
+    journal_retry_delay,
+)
+from bot.db.database import async_session
+from bot.db.models import Base, EvmCrosschainSwap, EVMLimitOrder, EVMSwap, TONSwap
+from bot.env import REDIS_URL
+
+redis = Redis.from_url(REDIS_URL, decode_responses=True)
+
+JOURNAL_STREAM = "journal:trades"
+JOURNAL_GROUP = "journal-writers"
+# entries that can never be written; kept for inspection and manual replay
+JOURNAL_DEAD_LETTERS = "journal:dead"
+
+journaled_models = {
+    model.__tablename__: model
+    for model in (EVMSwap, TONSwap, EvmCrosschainSwap, EVMLimitOrder)
+}
+
+
+def dump_record(record: Base) -> dict:
+    # the primary key is fixed here so a batch that is replayed after a crash
+    # conflicts with the rows it already wrote instead of duplicating them.
+    # Every column is written, so all rows of a multi-row insert share keys;
+    # an explicit NULL would override a default, so defaults are applied too
+    mapper = inspect(record).mapper
+    now = datetime.now(timezone.utc)
+    for column in mapper.columns:
+        if getattr(record, column.key) is not None:
+            continue
+        if column.default is not None and column.default.is_scalar:
+            setattr(record, column.key, column.default.arg)
+        elif column.primary_key and isinstance(column.type, Uuid):
+            setattr(record, column.key, uuid.uuid4())
+        elif isinstance(column.type, DateTime) and (
+            column.primary_key or column.server_default is not None
+        ):
+            setattr(
+                record,
+                column.key,
+                now if column.type.timezone else now.replace(tzinfo=None),
+            )
+    values = {column.key: getattr(record, column.key) for column in mapper.column_attrs}
+    return {
+        "table": record.__tablename__,
+        "values": json.dumps(values, default=str, separators=(",", ":")),
+    }
+
+
+def load_record(model: type[Base], data: str) -> dict:
+    values = json.loads(data)
+    for key, value in values.items():
+        if value is None:
+            continue
+        column_type = model.__table__.c[key].type
+        if isinstance(column_type, Numeric):
+            values[key] = Decimal(value)
+        elif isinstance(column_type, Uuid):
+            values[key] = uuid.UUID(value)
+        elif isinstance(column_type, DateTime):
+            values[key] = datetime.fromisoformat(value)
+    return values
+
+
+async def journal(*records: Base) -> None:
+    try:
+        async with redis.pipeline(transaction=False) as pipe:
+            for record in records:
+                pipe.xadd(JOURNAL_STREAM, dump_record(record))
+            await pipe.execute()
+    except Exception:
+        logging.exception("Error journaling trade records, writing them directly")
+        async with async_session() as session:
+            session.add_all(records)
+            await session.commit()
+
+
+async def insert_rows(rows: dict) -> None:
+    async with async_session() as session:
+        for model, values in rows.items():
+            # defaults were applied in dump_record, so NULLs are real NULLs and
+            # every row keeps the same keys and lands in one multi-row insert
+            await session.execute(
+                insert(model)
+                .on_conflict_do_nothing()
+                .execution_options(render_nulls=True),
+                values,
+            )
+        await session.commit()
+
+
+async def dead_letter(entry_id: str, fields: dict, error: Exception) -> None:
+    logging.error(f"Moving journal entry {entry_id} to {JOURNAL_DEAD_LETTERS}: {error}")
+    await redis.xadd(
+        JOURNAL_DEAD_LETTERS,
+        {**(fields or {}), "entry_id": entry_id, "error": str(error)[:1000]},
+    )
+
+
+async def write_entries(entries: list) -> None:
+    rows = defaultdict(list)
+    loaded = []
+    for entry_id, fields in entries:
+        try:
+            model = journaled_models[fields["table"]]
+            values = load_record(model, fields["values"])
+        except Exception as e:
+            await dead_letter(entry_id, fields, e)
+            continue
+        rows[model].append(values)
+        loaded.append((entry_id, fields, model, values))
+
+    try:
+        await insert_rows(rows)
+    except (DataError, IntegrityError):
+        # one bad row fails the whole batch; write the rows one by one so only
+        # the bad ones are set aside. Anything else (the database being
+        # unreachable, say) propagates and the batch is retried as a whole
+        logging.exception("Error writing journal batch, writing entries one by one")
+        for entry_id, fields, model, values in loaded:
+            try:
+                await insert_rows({model: [values]})
+            except (DataError, IntegrityError) as e:
+                await dead_letter(entry_id, fields, e)
+
+    entry_ids = [entry_id for entry_id, _ in entries]
+    await redis.xack(JOURNAL_STREAM, JOURNAL_GROUP, *entry_ids)
+    await redis.xdel(JOURNAL_STREAM, *entry_ids)
+
+
+async def create_journal_group() -> None:
+    try:
+        await redis.xgroup_create(JOURNAL_STREAM, JOURNAL_GROUP, id="0", mkstream=True)
+    except Exception as e:
+        if "BUSYGROUP" not in str(e):
+            raise
+
+
+async def claim_stale_entries(consumer: str) -> None:
+    # entries another process read but never wrote; xautoclaim scans at most
+    # count entries per call, so follow the cursor until it wraps around
+    start_id = "0-0"
+    while True:
+        response = await redis.xautoclaim(
+            JOURNAL_STREAM,
+            JOURNAL_GROUP,
+            consumer,
+            min_idle_time=journal_claim_idle_ms,
+            start_id=start_id,
+            count=journal_batch_size,
+        )
+        start_id = response[0]
+        if start_id == "0-0":
+            return
+
+
+async def run_journal_flusher() -> None:
+    consumer = socket.gethostname()
+    pending = True
+    last_claim = 0.0
+    while True:
+        try:
+            if pending:
+                await create_journal_group()
+            if time.monotonic() - last_claim >= journal_claim_interval:
+                await claim_stale_entries(consumer)
+                last_claim = time.monotonic()
+                pending = True
+            response = await redis.xreadgroup(
+                JOURNAL_GROUP,
+                consumer,
+                {JOURNAL_STREAM: "0" if pending else ">"},
+                count=journal_batch_size,
+                block=None if pending else journal_block_ms,
+            )
+            entries = response[0][1] if response else []
+            if entries:
+                await write_entries(entries)
+            elif pending:
+                pending = False
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logging.exception("Error flushing trade journal")
+            pending = True
+            await asyncio.sleep(journal_retry_delay)
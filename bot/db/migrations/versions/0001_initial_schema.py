@@ -0,0 +1,185 @@
+"""initial schema
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+revision: str = "0001"
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+CHAIN_IDS = ("ETHEREUM", "OP", "BSC", "POLYGON", "ARBITRUM", "AVALANCHE", "BASE")
+
+
+def upgrade() -> None:
+    chain_id = postgresql.ENUM(*CHAIN_IDS, name="chainid", create_type=False)
+    postgresql.ENUM(*CHAIN_IDS, name="chainid").create(op.get_bind())
+
+    op.create_table(
+        "users",
+        sa.Column("id", sa.BigInteger(), autoincrement=False, nullable=False),
+        sa.Column("from_ref", sa.BigInteger(), nullable=True),
+        sa.Column("referrals", postgresql.JSONB(), nullable=False),
+        sa.Column(
+            "created_at", sa.DateTime(), server_default=sa.func.now(), nullable=False
+        ),
+        sa.CheckConstraint("id >= 0", name="check_user_id_non_negative"),
+        sa.ForeignKeyConstraint(["from_ref"], ["users.id"]),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_users_id", "users", ["id"])
+
+    op.create_table(
+        "wallets",
+        sa.Column("id", sa.String(), nullable=False),
+        sa.Column("user_id", sa.BigInteger(), nullable=False),
+        sa.Column("encrypted_private_key", sa.String(), nullable=False),
+        sa.Column("address", sa.String(), nullable=False),
+        sa.CheckConstraint("user_id >= 0", name="check_wallet_user_id_non_negative"),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"]),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("user_id"),
+    )
+    op.create_index("ix_wallets_id", "wallets", ["id"], unique=True)
+
+    op.create_table(
+        "evm_swaps",
+        sa.Column("id", sa.Uuid(), nullable=False),
+        sa.Column("user_id", sa.BigInteger(), nullable=False),
+        sa.Column("chain_id", chain_id, nullable=False),
+        sa.Column("amount", sa.Numeric(precision=100, scale=0), nullable=False),
+        sa.Column("from_token", sa.String(), nullable=False),
+        sa.Column("to_token", sa.String(), nullable=False),
+        sa.Column("tx_hash", sa.String(), nullable=False),
+        sa.Column(
+            "timestamp",
+            sa.DateTime(timezone=True),
+            server_default=sa.func.now(),
+            nullable=False,
+        ),
+        sa.CheckConstraint("user_id >= 0", name="check_swap_user_id_non_negative"),
+        sa.CheckConstraint("amount >= 0.0", name="check_swap_amount_non_negative"),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"]),
+        sa.PrimaryKeyConstraint("id"),
+    )
+
+    op.create_table(
+        "evm_limit_orders",
+        sa.Column("id", sa.Uuid(), nullable=False),
+        sa.Column("chain_id", chain_id, nullable=False),
+        sa.Column("salt", sa.BigInteger(), nullable=False),
+        sa.Column("maker_token", sa.String(), nullable=False),
+        sa.Column("taker_token", sa.String(), nullable=False),
+        sa.Column("maker", sa.String(), nullable=False),
+        sa.Column("allowed_sender", sa.String(), nullable=True),
+        sa.Column("making_amount", sa.Numeric(precision=100, scale=0), nullable=False),
+        sa.Column("taking_amount", sa.Numeric(precision=100, scale=0), nullable=False),
+        sa.Column("min_return", sa.Numeric(precision=100, scale=0), nullable=False),
+        sa.Column("deadline", sa.BigInteger(), nullable=False),
+        sa.Column("partially_able", sa.Boolean(), nullable=False),
+        sa.Column("order_hash", sa.String(), nullable=False),
+        sa.Column("cancel_hash", sa.String(), nullable=True),
+        sa.Column(
+            "created_at", sa.DateTime(), server_default=sa.func.now(), nullable=False
+        ),
+        sa.Column(
+            "updated_at", sa.DateTime(), server_default=sa.func.now(), nullable=False
+        ),
+        sa.Column("user_id", sa.BigInteger(), nullable=False),
+        sa.Column("canceled", sa.Boolean(), nullable=False),
+        sa.CheckConstraint(
+            "making_amount >= 0.0", name="check_making_amount_non_negative"
+        ),
+        sa.CheckConstraint(
+            "taking_amount >= 0.0", name="check_taking_amount_non_negative"
+        ),
+        sa.CheckConstraint("min_return >= 0.0", name="check_min_return_non_negative"),
+        sa.CheckConstraint("deadline > 0", name="check_deadline_positive"),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"]),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("salt"),
+    )
+
+    op.create_table(
+        "evm_crosschain_swaps",
+        sa.Column("id", sa.Uuid(), nullable=False),
+        sa.Column("user_id", sa.BigInteger(), nullable=False),
+        sa.Column("from_chain_id", chain_id, nullable=False),
+        sa.Column("to_chain_id", chain_id, nullable=False),
+        sa.Column("from_token", sa.String(), nullable=False),
+        sa.Column("to_token", sa.String(), nullable=False),
+        sa.Column("amount", sa.Numeric(precision=100, scale=0), nullable=False),
+        sa.Column("slippage", sa.Numeric(precision=5, scale=3), nullable=False),
+        sa.Column("max_price_impact_percent", sa.BigInteger(), nullable=False),
+        sa.Column("user_wallet", sa.String(), nullable=False),
+        sa.Column("bridge_id", sa.String(), nullable=True),
+        sa.Column("tx_hash", sa.String(), nullable=True),
+        sa.Column("status", sa.String(), nullable=False),
+        sa.Column(
+            "created_at", sa.DateTime(), server_default=sa.func.now(), nullable=False
+        ),
+        sa.Column(
+            "updated_at", sa.DateTime(), server_default=sa.func.now(), nullable=False
+        ),
+        sa.CheckConstraint("amount >= 0.0", name="check_swap_amount_non_negative"),
+        sa.CheckConstraint(
+            "max_price_impact_percent >= 0", name="check_price_impact_non_negative"
+        ),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"]),
+        sa.PrimaryKeyConstraint("id"),
+    )
+
+    op.create_table(
+        "ton_wallets",
+        sa.Column("id", sa.String(), nullable=False),
+        sa.Column("user_id", sa.BigInteger(), nullable=False),
+        sa.Column("encrypted_mnemonic", sa.String(), nullable=False),
+        sa.Column("address", sa.String(), nullable=False),
+        sa.CheckConstraint("user_id >= 0", name="check_wallet_user_id_non_negative"),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"]),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("user_id"),
+    )
+    op.create_index("ix_ton_wallets_id", "ton_wallets", ["id"], unique=True)
+
+    op.create_table(
+        "ton_swaps",
+        sa.Column("id", sa.Uuid(), nullable=False),
+        sa.Column("user_id", sa.BigInteger(), nullable=False),
+        sa.Column("amount", sa.Numeric(precision=100, scale=0), nullable=False),
+        sa.Column("from_token", sa.String(), nullable=False),
+        sa.Column("to_token", sa.String(), nullable=False),
+        sa.Column(
+            "timestamp",
+            sa.DateTime(timezone=True),
+            server_default=sa.func.now(),
+            nullable=False,
+        ),
+        sa.CheckConstraint("user_id >= 0", name="check_swap_user_id_non_negative"),
+        sa.CheckConstraint("amount >= 0.0", name="check_swap_amount_non_negative"),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"]),
+        sa.PrimaryKeyConstraint("id"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("ton_swaps")
+    op.drop_index("ix_ton_wallets_id", table_name="ton_wallets")
+    op.drop_table("ton_wallets")
+    op.drop_table("evm_crosschain_swaps")
+    op.drop_table("evm_limit_orders")
+    op.drop_table("evm_swaps")
+    op.drop_index("ix_wallets_id", table_name="wallets")
+    op.drop_table("wallets")
+    op.drop_index("ix_users_id", table_name="users")
+    op.drop_table("users")
+    postgresql.ENUM(name="chainid").drop(op.get_bind())
@@ -0,0 +1,68 @@
+"""indexes for history, limit order and status lookups
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18 12:05:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+revision: str = "0002"
+down_revision: Union[str, None] = "0001"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# built concurrently so upgrading a live database does not lock the
+# history tables for writes
+INDEXES = (
+    ("ix_evm_swaps_user_id_timestamp", "evm_swaps", ["user_id", "timestamp"]),
+    ("ix_evm_swaps_tx_hash", "evm_swaps", ["tx_hash"]),
+    (
+        "ix_evm_limit_orders_user_id_order_hash",
+        "evm_limit_orders",
+        ["user_id", "order_hash"],
+    ),
+    (
+        "ix_evm_limit_orders_user_id_created_at",
+        "evm_limit_orders",
+        ["user_id", "created_at"],
+    ),
+    (
+        "ix_evm_crosschain_swaps_user_id_created_at",
+        "evm_crosschain_swaps",
+        ["user_id", "created_at"],
+    ),
+    ("ix_evm_crosschain_swaps_tx_hash", "evm_crosschain_swaps", ["tx_hash"]),
+    (
+        "ix_evm_crosschain_swaps_status_created_at",
+        "evm_crosschain_swaps",
+        ["status", "created_at"],
+    ),
+    ("ix_ton_swaps_user_id_timestamp", "ton_swaps", ["user_id", "timestamp"]),
+)
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, table, columns in INDEXES:
+            op.create_index(
+                name,
+                table,
+                columns,
+                postgresql_concurrently=True,
+                if_not_exists=True,
+            )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, table, _ in reversed(INDEXES):
+            op.drop_index(
+                name,
+                table_name=table,
+                postgresql_concurrently=True,
+                if_exists=True,
+            )
@@ -0,0 +1,67 @@
+"""move referrals from the users.referrals jsonb list to an edge table
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18 13:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+revision: str = "0003"
+down_revision: Union[str, None] = "0002"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "referrals",
+        sa.Column("referrer_id", sa.BigInteger(), nullable=False),
+        sa.Column("referee_id", sa.BigInteger(), nullable=False),
+        sa.Column(
+            "created_at", sa.DateTime(), server_default=sa.func.now(), nullable=False
+        ),
+        sa.ForeignKeyConstraint(["referrer_id"], ["users.id"]),
+        sa.ForeignKeyConstraint(["referee_id"], ["users.id"]),
+        sa.PrimaryKeyConstraint("referrer_id", "referee_id"),
+        sa.UniqueConstraint("referee_id", name="uq_referrals_referee_id"),
+    )
+    # users.from_ref was written together with the jsonb list and is the
+    # one that cannot hold duplicates, so it is the source for the backfill
+    op.execute("""
+        INSERT INTO referrals (referrer_id, referee_id, created_at)
+        SELECT from_ref, id, created_at
+        FROM users
+        WHERE from_ref IS NOT NULL AND from_ref <> id
+        ON CONFLICT DO NOTHING
+        """)
+    op.drop_column("users", "referrals")
+
+
+def downgrade() -> None:
+    op.add_column(
+        "users",
+        sa.Column(
+            "referrals",
+            postgresql.JSONB(),
+            server_default=sa.text("'[]'::jsonb"),
+            nullable=False,
+        ),
+    )
+    op.execute("""
+        UPDATE users
+        SET referrals = r.referees
+        FROM (
+            SELECT referrer_id, jsonb_agg(referee_id ORDER BY created_at) AS referees
+            FROM referrals
+            GROUP BY referrer_id
+        ) AS r
+        WHERE users.id = r.referrer_id
+        """)
+    op.alter_column("users", "referrals", server_default=None)
+    op.drop_table("referrals")
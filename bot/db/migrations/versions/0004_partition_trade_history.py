@@ -0,0 +1,96 @@
+"""partition trade history tables by month
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18 14:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+revision: str = "0004"
+down_revision: Union[str, None] = "0003"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# evm_limit_orders stays a plain table: it holds live orders that are looked
+# up and cancelled by hash and relies on a global unique salt
+TABLES = {
+    "evm_swaps": (
+        "timestamp",
+        {
+            "ix_evm_swaps_user_id_timestamp": "user_id, timestamp",
+            "ix_evm_swaps_tx_hash": "tx_hash",
+        },
+    ),
+    "ton_swaps": (
+        "timestamp",
+        {"ix_ton_swaps_user_id_timestamp": "user_id, timestamp"},
+    ),
+    "evm_crosschain_swaps": (
+        "created_at",
+        {
+            "ix_evm_crosschain_swaps_user_id_created_at": "user_id, created_at",
+            "ix_evm_crosschain_swaps_tx_hash": "tx_hash",
+            "ix_evm_crosschain_swaps_status_created_at": "status, created_at",
+        },
+    ),
+}
+
+MONTHS_AHEAD = 3
+
+
+def replace_table(table: str, indexes: dict, create: str, primary_key: str) -> None:
+    op.execute(f"ALTER TABLE {table} RENAME TO {table}_old")
+    op.execute(f"ALTER INDEX {table}_pkey RENAME TO {table}_old_pkey")
+    for name in indexes:
+        op.execute(f"DROP INDEX {name}")
+
+    op.execute(
+        f"CREATE TABLE {table} "
+        f"(LIKE {table}_old INCLUDING DEFAULTS INCLUDING CONSTRAINTS) {create}"
+    )
+    op.execute(f"ALTER TABLE {table} ADD PRIMARY KEY ({primary_key})")
+    op.execute(f"ALTER TABLE {table} ADD FOREIGN KEY (user_id) REFERENCES users (id)")
+
+
+def upgrade() -> None:
+    op.execute("SET LOCAL TimeZone = 'UTC'")
+    for table, (column, indexes) in TABLES.items():
+        replace_table(table, indexes, f"PARTITION BY RANGE ({column})", f"id, {column}")
+        op.execute(f"""
+            DO $$
+            DECLARE
+                month date := date_trunc(
+                    'month', coalesce((SELECT min({column}) FROM {table}_old), now())
+                );
+                last_month date := date_trunc('month', now())
+                    + interval '{MONTHS_AHEAD} months';
+            BEGIN
+                WHILE month <= last_month LOOP
+                    EXECUTE format(
+                        'CREATE TABLE %I PARTITION OF {table} '
+                        'FOR VALUES FROM (%L) TO (%L)',
+                        '{table}_' || to_char(month, 'YYYY_MM'),
+                        month || ' 00:00:00+00',
+                        (month + interval '1 month')::date || ' 00:00:00+00'
+                    );
+                    month := month + interval '1 month';
+                END LOOP;
+            END $$
+            """)
+        op.execute(f"INSERT INTO {table} SELECT * FROM {table}_old")
+        op.execute(f"DROP TABLE {table}_old")
+        for name, columns in indexes.items():
+            op.execute(f"CREATE INDEX {name} ON {table} ({columns})")
+
+
+def downgrade() -> None:
+    for table, (_, indexes) in TABLES.items():
+        replace_table(table, indexes, "", "id")
+        op.execute(f"INSERT INTO {table} SELECT * FROM {table}_old")
+        op.execute(f"DROP TABLE {table}_old")
+        for name, columns in indexes.items():
+            op.execute(f"CREATE INDEX {name} ON {table} ({columns})")
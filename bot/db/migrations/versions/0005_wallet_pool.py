@@ -0,0 +1,36 @@
+"""wallet pool for instant registration
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-18 15:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "0005"
+down_revision: Union[str, None] = "0004"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "wallet_pool",
+        sa.Column("id", sa.BigInteger(), autoincrement=True, nullable=False),
+        sa.Column("encrypted_private_key", sa.String(), nullable=False),
+        sa.Column("evm_address", sa.String(), nullable=False),
+        sa.Column("encrypted_mnemonic", sa.String(), nullable=False),
+        sa.Column("ton_address", sa.String(), nullable=False),
+        sa.Column(
+            "created_at", sa.DateTime(), server_default=sa.func.now(), nullable=False
+        ),
+        sa.PrimaryKeyConstraint("id"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("wallet_pool")
@@ -0,0 +1,32 @@
+"""default partitions for trade history
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-19 10:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+revision: str = "0007"
+down_revision: Union[str, None] = "0006"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TABLES = ["evm_swaps", "ton_swaps", "evm_crosschain_swaps"]
+
+
+def upgrade() -> None:
+    for table in TABLES:
+        op.execute(
+            f"CREATE TABLE IF NOT EXISTS {table}_default PARTITION OF {table} DEFAULT"
+        )
+
+
+def downgrade() -> None:
+    # rows in the default partition have no monthly partition to go back to,
+    # so the tables are only detached and left for manual cleanup
+    for table in TABLES:
+        op.execute(f"ALTER TABLE {table} DETACH PARTITION {table}_default")
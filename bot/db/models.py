@@ -8,11 +8,13 @@ from sqlalchemy import (
     CheckConstraint,
     DateTime,
     ForeignKey,
+    Index,
+    Integer,
     Numeric,
     String,
+    UniqueConstraint,
     func,
 )
-from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.ext.asyncio import AsyncAttrs
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column, relationship
 
@@ -32,7 +34,6 @@ class User(Base):
     from_ref: Mapped[Optional[int]] = mapped_column(
         BigInteger, ForeignKey("users.id"), nullable=True, default=None
     )
-    referrals: Mapped[list] = mapped_column(JSONB, default=list, nullable=False)
     created_at: Mapped[datetime] = mapped_column(
         DateTime, server_default=func.now(), nullable=False
     )
@@ -40,22 +41,24 @@ class User(Base):
     evm_wallet: Mapped["EVMWallet"] = relationship(
         "EVMWallet", back_populates="user", uselist=False, lazy="joined"
     )
-    evm_swaps: Mapped["EVMSwap"] = relationship(
-        "EVMSwap", back_populates="user", lazy="selectin"
+    # trade history is never loaded with the user; use selectinload or
+    # awaitable_attrs when it is actually needed
+    evm_swaps: Mapped[list["EVMSwap"]] = relationship(
+        "EVMSwap", back_populates="user", lazy="select"
     )
-    evm_limit_orders: Mapped["EVMLimitOrder"] = relationship(
-        "EVMLimitOrder", back_populates="user", lazy="selectin"
+    evm_limit_orders: Mapped[list["EVMLimitOrder"]] = relationship(
+        "EVMLimitOrder", back_populates="user", lazy="select"
     )
-    evm_crosschain_swaps: Mapped["EvmCrosschainSwap"] = relationship(
-        "EvmCrosschainSwap", back_populates="user", lazy="selectin"
+    evm_crosschain_swaps: Mapped[list["EvmCrosschainSwap"]] = relationship(
+        "EvmCrosschainSwap", back_populates="user", lazy="select"
     )
 
     ton_wallet: Mapped["TONWallet"] = relationship(
         "TONWallet", back_populates="user", uselist=False, lazy="joined"
     )
 
-    ton_swaps: Mapped["TONSwap"] = relationship(
-        "TONSwap", back_populates="user", lazy="selectin"
+    ton_swaps: Mapped[list["TONSwap"]] = relationship(
+        "TONSwap", back_populates="user", lazy="select"
     )
 
     __table_args__ = (CheckConstraint("id >= 0", name="check_user_id_non_negative"),)
@@ -65,6 +68,23 @@ class User(Base):
         return User(id=id, from_ref=from_ref)
 
 
+class Referral(Base):
+    __tablename__ = "referrals"
+
+    referrer_id: Mapped[int] = mapped_column(
+        BigInteger, ForeignKey("users.id"), primary_key=True
+    )
+    referee_id: Mapped[int] = mapped_column(
+        BigInteger, ForeignKey("users.id"), primary_key=True
+    )
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime, server_default=func.now(), nullable=False
+    )
+
+    # the primary key index serves the per-referrer count
+    __table_args__ = (UniqueConstraint("referee_id", name="uq_referrals_referee_id"),)
+
+
 class EVMWallet(Base):
     __tablename__ = "wallets"
 
@@ -98,6 +118,49 @@ class EVMWallet(Base):
         )
 
 
+class Token(Base):
+    __tablename__ = "tokens"
+
+    # EVM token metadata, loaded into memory at startup by bot/utils/token_registry.py
+    chain_id: Mapped[int] = mapped_column(BigInteger, primary_key=True)
+    address: Mapped[str] = mapped_column(String, primary_key=True)
+    decimals: Mapped[int] = mapped_column(Integer, nullable=False)
+    symbol: Mapped[Optional[str]] = mapped_column(String, nullable=True)
+    name: Mapped[Optional[str]] = mapped_column(String, nullable=True)
+    logo: Mapped[Optional[str]] = mapped_column(String, nullable=True)
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime, server_default=func.now(), onupdate=func.now(), nullable=False
+    )
+
+
+class WalletPool(Base):
+    __tablename__ = "wallet_pool"
+
+    # pre-generated wallets handed out by registration, see bot/db/wallet_pool.py
+    id: Mapped[int] = mapped_column(BigInteger, primary_key=True, autoincrement=True)
+    encrypted_private_key: Mapped[str] = mapped_column(String, nullable=False)
+    evm_address: Mapped[str] = mapped_column(String, nullable=False)
+    encrypted_mnemonic: Mapped[str] = mapped_column(String, nullable=False)
+    ton_address: Mapped[str] = mapped_column(String, nullable=False)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime, server_default=func.now(), nullable=False
+    )
+
+    @staticmethod
+    def create_wallet(
+        encrypted_private_key: str,
+        evm_address: str,
+        encrypted_mnemonic: str,
+        ton_address: str,
+    ) -> "WalletPool":
+        return WalletPool(
+            encrypted_private_key=encrypted_private_key,
+            evm_address=evm_address,
+            encrypted_mnemonic=encrypted_mnemonic,
+            ton_address=ton_address,
+        )
+
+
 class EVMSwap(Base):
     __tablename__ = "evm_swaps"
 
@@ -113,14 +176,18 @@ class EVMSwap(Base):
     to_token: Mapped[str] = mapped_column(String, nullable=False)
     tx_hash: Mapped[str] = mapped_column(String, nullable=False)
     timestamp: Mapped[datetime] = mapped_column(
-        DateTime(timezone=True), server_default=func.now(), nullable=False
+        DateTime(timezone=True), server_default=func.now(), primary_key=True
     )
 
-    user = relationship("User", back_populates="evm_swaps", lazy="selectin")
+    user = relationship("User", back_populates="evm_swaps", lazy="select")
 
+    # history tables are partitioned by month, see bot/db/partitions.py
     __table_args__ = (
         CheckConstraint("user_id >= 0", name="check_swap_user_id_non_negative"),
         CheckConstraint("amount >= 0.0", name="check_swap_amount_non_negative"),
+        Index("ix_evm_swaps_user_id_timestamp", "user_id", "timestamp"),
+        Index("ix_evm_swaps_tx_hash", "tx_hash"),
+        {"postgresql_partition_by": "RANGE (timestamp)"},
     )
 
     @staticmethod
@@ -175,7 +242,7 @@ class EVMLimitOrder(Base):
         BigInteger, ForeignKey("users.id"), nullable=False
     )
     user: Mapped["User"] = relationship(
-        "User", back_populates="evm_limit_orders", lazy="selectin"
+        "User", back_populates="evm_limit_orders", lazy="select"
     )
 
     canceled: Mapped[bool] = mapped_column(default=False, nullable=False)
@@ -189,6 +256,8 @@ class EVMLimitOrder(Base):
         ),
         CheckConstraint("min_return >= 0.0", name="check_min_return_non_negative"),
         CheckConstraint("deadline > 0", name="check_deadline_positive"),
+        Index("ix_evm_limit_orders_user_id_order_hash", "user_id", "order_hash"),
+        Index("ix_evm_limit_orders_user_id_created_at", "user_id", "created_at"),
     )
 
     @staticmethod
@@ -247,19 +316,23 @@ class EvmCrosschainSwap(Base):
     tx_hash: Mapped[Optional[str]] = mapped_column(String, nullable=True)
     status: Mapped[str] = mapped_column(String, nullable=False, default="pending")
     created_at: Mapped[datetime] = mapped_column(
-        DateTime, server_default=func.now(), nullable=False
+        DateTime, server_default=func.now(), primary_key=True
     )
     updated_at: Mapped[datetime] = mapped_column(
         DateTime, server_default=func.now(), onupdate=func.now()
     )
 
-    user = relationship("User", back_populates="evm_crosschain_swaps", lazy="selectin")
+    user = relationship("User", back_populates="evm_crosschain_swaps", lazy="select")
 
     __table_args__ = (
         CheckConstraint("amount >= 0.0", name="check_swap_amount_non_negative"),
         CheckConstraint(
             "max_price_impact_percent >= 0", name="check_price_impact_non_negative"
         ),
+        Index("ix_evm_crosschain_swaps_user_id_created_at", "user_id", "created_at"),
+        Index("ix_evm_crosschain_swaps_tx_hash", "tx_hash"),
+        Index("ix_evm_crosschain_swaps_status_created_at", "status", "created_at"),
+        {"postgresql_partition_by": "RANGE (created_at)"},
     )
 
     @staticmethod
@@ -337,14 +410,16 @@ class TONSwap(Base):
     from_token: Mapped[str] = mapped_column(String, nullable=False)
     to_token: Mapped[str] = mapped_column(String, nullable=False)
     timestamp: Mapped[datetime] = mapped_column(
-        DateTime(timezone=True), server_default=func.now(), nullable=False
+        DateTime(timezone=True), server_default=func.now(), primary_key=True
     )
 
-    user = relationship("User", back_populates="ton_swaps", lazy="selectin")
+    user = relationship("User", back_populates="ton_swaps", lazy="select")
 
     __table_args__ = (
         CheckConstraint("user_id >= 0", name="check_swap_user_id_non_negative"),
         CheckConstraint("amount >= 0.0", name="check_swap_amount_non_negative"),
+        Index("ix_ton_swaps_user_id_timestamp", "user_id", "timestamp"),
+        {"postgresql_partition_by": "RANGE (timestamp)"},
     )
 
     @staticmethod
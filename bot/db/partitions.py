@@ -0,0 +1,175 @@
+import asyncio
+import gzip
+import logging
+import os
+import re
+from datetime import date, datetime, timezone
+from pathlib import Path
+from typing import Optional
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from bot.config import (
+    partition_archive_dir,
+    partition_maintenance_interval,
+    partition_months_ahead,
+    partition_retention_months,
+)
+from bot.db.database import engine
+from bot.db.models import Base
+
+# table name -> the column it is partitioned on
+partitioned_tables = {
+    table.name: re.fullmatch(
+        r"RANGE \((\w+)\)", table.dialect_options["postgresql"]["partition_by"]
+    ).group(1)
+    for table in Base.metadata.sorted_tables
+    if table.dialect_options["postgresql"]["partition_by"]
+}
+
+
+def add_months(month: date, months: int) -> date:
+    index = month.month - 1 + months
+    return date(month.year + index // 12, index % 12 + 1, 1)
+
+
+def current_month() -> date:
+    return datetime.now(timezone.utc).date().replace(day=1)
+
+
+def partition_name(table: str, month: date) -> str:
+    return f"{table}_{month:%Y_%m}"
+
+
+def default_partition(table: str) -> str:
+    return f"{table}_default"
+
+
+def partition_month(table: str, partition: str) -> Optional[date]:
+    match = re.fullmatch(rf"{table}_(\d{{4}})_(\d{{2}})", partition)
+    if match is None:
+        return None
+    return date(int(match.group(1)), int(match.group(2)), 1)
+
+
+async def create_partition(
+    conn: AsyncConnection, table: str, month: date, default_rows: bool
+) -> None:
+    column = partitioned_tables[table]
+    partition = partition_name(table, month)
+    start = f"'{month} 00:00:00+00'"
+    end = f"'{add_months(month, 1)} 00:00:00+00'"
+    create = text(
+        f"CREATE TABLE {partition} PARTITION OF {table} "
+        f"FOR VALUES FROM ({start}) TO ({end})"
+    )
+    if not default_rows:
+        await conn.execute(create)
+        return
+
+    # rows of this month already sit in the default partition, which would
+    # make the new partition's bounds overlap it; move them over first
+    default = default_partition(table)
+    await conn.execute(text(f"ALTER TABLE {table} DETACH PARTITION {default}"))
+    await conn.execute(create)
+    await conn.execute(
+        text(
+            f"WITH moved AS (DELETE FROM {default} "
+            f"WHERE {column} >= {start} AND {column} < {end} RETURNING *) "
+            f"INSERT INTO {partition} SELECT * FROM moved"
+        )
+    )
+    await conn.execute(text(f"ALTER TABLE {table} ATTACH PARTITION {default} DEFAULT"))
+
+
+async def create_partitions(conn: AsyncConnection, table: str) -> None:
+    # rows outside every month land in the default partition instead of
+    # failing to insert
+    await conn.execute(
+        text(
+            f"CREATE TABLE IF NOT EXISTS {default_partition(table)} "
+            f"PARTITION OF {table} DEFAULT"
+        )
+    )
+    existing = set(await list_partitions(conn, table))
+    default_rows = await count_default_rows(conn, table)
+    month = current_month()
+    for _ in range(partition_months_ahead + 1):
+        if partition_name(table, month) not in existing:
+            await create_partition(conn, table, month, default_rows > 0)
+        month = add_months(month, 1)
+
+
+async def count_default_rows(conn: AsyncConnection, table: str) -> int:
+    result = await conn.execute(
+        text(f"SELECT count(*) FROM {default_partition(table)}")
+    )
+    return result.scalar()
+
+
+async def list_partitions(conn: AsyncConnection, table: str) -> list[str]:
+    result = await conn.execute(
+        text(
+            "SELECT child.relname FROM pg_inherits "
+            "JOIN pg_class parent ON parent.oid = pg_inherits.inhparent "
+            "JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+            "WHERE parent.relname = :table ORDER BY child.relname"
+        ),
+        {"table": table},
+    )
+    return list(result.scalars())
+
+
+async def archive_partition(table: str, partition: str) -> Path:
+    archive_dir = Path(partition_archive_dir)
+    archive_dir.mkdir(parents=True, exist_ok=True)
+    path = archive_dir / f"{partition}.csv.gz"
+    partial_path = path.with_suffix(".gz.partial")
+
+    # old months receive no writes, so the copy taken while the partition is
+    # still attached is complete; it is only dropped once the file is in place
+    async with engine.connect() as conn:
+        raw_connection = await conn.get_raw_connection()
+        with gzip.open(partial_path, "wb") as archive:
+
+            async def write(chunk: bytes) -> None:
+                await asyncio.to_thread(archive.write, chunk)
+
+            await raw_connection.driver_connection.copy_from_table(
+                partition, output=write, format="csv", header=True
+            )
+    os.replace(partial_path, path)
+
+    async with engine.begin() as conn:
+        await conn.execute(text(f"ALTER TABLE {table} DETACH PARTITION {partition}"))
+        await conn.execute(text(f"DROP TABLE {partition}"))
+    return path
+
+
+async def maintain_partitions() -> None:
+    cutoff = add_months(current_month(), -partition_retention_months)
+    for table in partitioned_tables:
+        async with engine.begin() as conn:
+            await create_partitions(conn, table)
+            partitions = await list_partitions(conn, table)
+            if default_rows := await count_default_rows(conn, table):
+                logging.error(
+                    f"{default_rows} rows of {table} fall outside every monthly "
+                    f"partition and sit in {default_partition(table)}"
+                )
+
+        for partition in partitions:
+            month = partition_month(table, partition)
+            if month is not None and add_months(month, 1) <= cutoff:
+                path = await archive_partition(table, partition)
+                logging.info(f"Archived {partition} to {path}")
+
+
+async def run_partition_maintenance() -> None:
+    while True:
+        try:
+            await maintain_partitions()
+        except Exception:
+            logging.exception("Error maintaining history partitions")
+        await asyncio.sleep(partition_maintenance_interval)
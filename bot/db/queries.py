@@ -1,37 +1,148 @@
+from dataclasses import astuple, dataclass
+from typing import Optional
+
 from aiogram import html
-from sqlalchemy import update
+from sqlalchemy import func
 from aiogram.types import Message
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 
-from bot.db.models import EVMLimitOrder, TONWallet, User, EVMWallet
+from bot.config import cache_settings
+from bot.db.models import EVMLimitOrder, Referral, TONWallet, User, EVMWallet
+from bot.db.wallet_pool import claim_pool_wallet
+from bot.utils.cache import TieredCache
 from bot.utils.wallet_generator import evm_generator, ton_generator
 from bot.utils.dex import decrypt_key, decrypt_mnemonic
 
+user_cache = TieredCache("user", **cache_settings["user"])
+
+
+@dataclass(frozen=True, slots=True)
+class EVMWalletRecord:
+    address: str
+    encrypted_private_key: str
+
+
+@dataclass(frozen=True, slots=True)
+class TONWalletRecord:
+    address: str
+    encrypted_mnemonic: str
+
+
+@dataclass(frozen=True, slots=True)
+class UserRecord:
+    id: int
+    from_ref: Optional[int]
+    evm_wallet: EVMWalletRecord
+    ton_wallet: TONWalletRecord
+
+    @staticmethod
+    def from_model(user: User) -> "UserRecord":
+        return UserRecord(
+            id=user.id,
+            from_ref=user.from_ref,
+            evm_wallet=EVMWalletRecord(
+                user.evm_wallet.address, user.evm_wallet.encrypted_private_key
+            ),
+            ton_wallet=TONWalletRecord(
+                user.ton_wallet.address, user.ton_wallet.encrypted_mnemonic
+            ),
+        )
+
+    def to_row(self) -> list:
+        return [
+            self.id,
+            self.from_ref,
+            *astuple(self.evm_wallet),
+            *astuple(self.ton_wallet),
+        ]
 
+    @staticmethod
+    def from_row(row: list) -> "UserRecord":
+        id, from_ref, evm_address, evm_key, ton_address, ton_mnemonic = row
+        return UserRecord(
+            id=id,
+            from_ref=from_ref,
+            evm_wallet=EVMWalletRecord(evm_address, evm_key),
+            ton_wallet=TONWalletRecord(ton_address, ton_mnemonic),
+        )
+
+
+async def cache_user(record: UserRecord) -> None:
+    # drops copies and lookups that still miss the user in every process
+    await user_cache.invalidate(str(record.id))
+    await user_cache.set(str(record.id), record.to_row())
 
-async def get_user_by_id(db: AsyncSession, user_id: int):
+
+async def get_user_model(db: AsyncSession, user_id: int, primary: bool = False):
     return (
-        await db.execute(select(User).where(User.id == user_id))
+        await db.execute(
+            select(User).where(User.id == user_id),
+            bind_arguments={"primary": primary},
+        )
     ).scalar_one_or_none()
 
 
+async def load_user_row(db: AsyncSession, user_id: int) -> Optional[list]:
+    # a miss leads to registration, so confirm it on the primary in case the
+    # replica has not caught up with a user that was just registered
+    try:
+        user = await get_user_model(db, user_id) or await get_user_model(
+            db, user_id, primary=True
+        )
+        return None if user is None else UserRecord.from_model(user).to_row()
+    finally:
+        # the lookup is a unit of work of its own: hand the connection back
+        # before the handler goes on to its network calls
+        await db.close()
+
+
+async def get_user_by_id(db: AsyncSession, user_id: int) -> Optional[UserRecord]:
+    row = await user_cache.load(str(user_id), lambda: load_user_row(db, user_id))
+    return None if row is None else UserRecord.from_row(row)
+
+
 async def get_user_by_id_for_update(db: AsyncSession, user_id: int):
     return (
-        await db.execute(select(User).where(User.id == user_id).with_for_update())
+        await db.execute(
+            select(User).where(User.id == user_id).with_for_update(of=User)
+        )
     ).scalar_one_or_none()
 
 
-async def user_referrals_update(db: AsyncSession, user: User) -> None:
-    await db.execute(
-        update(User)
-        .where(User.id == user.id)
-        .values(
-            referrals=user.referrals,
+async def user_exists(db: AsyncSession, user_id: int) -> bool:
+    if (entry := await user_cache.get(str(user_id))) is not None and entry.value:
+        return True
+    return (
+        await db.execute(
+            select(User.id).where(User.id == user_id),
+            bind_arguments={"primary": True},
         )
+    ).scalar_one_or_none() is not None
+
+
+async def add_referral(db: AsyncSession, referrer_id: int, referee_id: int) -> None:
+    await db.execute(
+        insert(Referral)
+        .values(referrer_id=referrer_id, referee_id=referee_id)
+        .on_conflict_do_nothing()
     )
 
 
+async def get_referrals_count(db: AsyncSession, user_id: int) -> int:
+    try:
+        return (
+            await db.execute(
+                select(func.count())
+                .select_from(Referral)
+                .where(Referral.referrer_id == user_id)
+            )
+        ).scalar_one()
+    finally:
+        await db.close()
+
+
 async def get_limit_order_by_hash(db: AsyncSession, user_id: int, hash: str):
     return (
         await db.execute(
@@ -49,31 +160,42 @@ async def get_ton_wallet_by_id(db: AsyncSession, user_id: int):
 
 
 async def registration(db: AsyncSession, user_id: int, message: Message, from_ref_id: int = None):
-    if from_ref_id:
-        referrer = await get_user_by_id_for_update(db, from_ref_id)
-        if referrer and user_id not in referrer.referrals:
-            referrer.referrals.append(user_id)
-            await user_referrals_update(db, referrer)
-        user = User.create_user(id=user_id, from_ref=from_ref_id)
-        db.add(user)
+    if from_ref_id and (
+        from_ref_id == user_id or not await user_exists(db, from_ref_id)
+    ):
+        from_ref_id = None
+    user = User.create_user(id=user_id, from_ref=from_ref_id)
+    db.add(user)
+
+    pool_wallet = await claim_pool_wallet(db)
+    if pool_wallet:
+        enc_private_key, address, enc_mnemonic, ton_address = pool_wallet
     else:
-        user = User.create_user(id=user_id, from_ref=None)
-        db.add(user)
-    
-    enc_private_key, address = evm_generator()
+        enc_private_key, address = evm_generator()
+        enc_mnemonic, ton_address = await ton_generator()
+
     evm_wallet = EVMWallet.create_wallet(
         user_id=user_id, encrypted_private_key=enc_private_key, address=address
     )
     db.add(evm_wallet)
-    
-    enc_mnemonic, ton_address = await ton_generator()
+
     ton_wallet = TONWallet.create_wallet(
         user_id=user_id, encrypted_mnemonic=enc_mnemonic, address=ton_address
     )
     db.add(ton_wallet)
-    
+
+    if from_ref_id:
+        await db.flush()
+        await add_referral(db, from_ref_id, user_id)
+
     await db.commit()
-    user = await get_user_by_id(db, message.from_user.id)
+    user = UserRecord(
+        id=user_id,
+        from_ref=user.from_ref,
+        evm_wallet=EVMWalletRecord(address, enc_private_key),
+        ton_wallet=TONWalletRecord(ton_address, enc_mnemonic),
+    )
+    await cache_user(user)
     await message.answer(
         text=f"Your EVM private key: {html.spoiler(decrypt_key(enc_private_key))} and TON mnemonic: {html.spoiler(decrypt_mnemonic(enc_mnemonic))}"
     )
@@ -0,0 +1,85 @@
+import asyncio
+import logging
+from typing import Optional
+
+from sqlalchemy import delete, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from bot.config import (
+    wallet_pool_batch_size,
+    wallet_pool_refill_interval,
+    wallet_pool_size,
+)
+from bot.db.database import async_session
+from bot.db.models import WalletPool
+from bot.utils.wallet_generator import evm_generator, ton_generator_batch
+
+
+async def claim_pool_wallet(db: AsyncSession) -> Optional[tuple[str, str, str, str]]:
+    # runs inside the registration transaction, so a failed sign-up puts the
+    # wallet back; SKIP LOCKED lets concurrent sign-ups take different rows
+    claimed = (
+        select(WalletPool.id)
+        .order_by(WalletPool.id)
+        .limit(1)
+        .with_for_update(skip_locked=True)
+        .scalar_subquery()
+    )
+    row = (
+        await db.execute(
+            delete(WalletPool)
+            .where(WalletPool.id == claimed)
+            .returning(
+                WalletPool.encrypted_private_key,
+                WalletPool.evm_address,
+                WalletPool.encrypted_mnemonic,
+                WalletPool.ton_address,
+            )
+        )
+    ).one_or_none()
+    return None if row is None else tuple(row)
+
+
+async def generate_pool_wallets(count: int) -> list[WalletPool]:
+    wallets = []
+    for encrypted_mnemonic, ton_address in await ton_generator_batch(count):
+        encrypted_private_key, evm_address = evm_generator()
+        wallets.append(
+            WalletPool.create_wallet(
+                encrypted_private_key=encrypted_private_key,
+                evm_address=evm_address,
+                encrypted_mnemonic=encrypted_mnemonic,
+                ton_address=ton_address,
+            )
+        )
+    return wallets
+
+
+async def fill_wallet_pool() -> int:
+    async with async_session() as session:
+        pooled = (
+            await session.execute(
+                select(func.count()).select_from(WalletPool),
+                bind_arguments={"primary": True},
+            )
+        ).scalar_one()
+
+    added = 0
+    while pooled + added < wallet_pool_size:
+        batch = min(wallet_pool_batch_size, wallet_pool_size - pooled - added)
+        wallets = await generate_pool_wallets(batch)
+        async with async_session() as session:
+            session.add_all(wallets)
+            await session.commit()
+        added += batch
+    return added
+
+
+async def run_wallet_pool_filler() -> None:
+    while True:
+        try:
+            if added := await fill_wallet_pool():
+                logging.info(f"Added {added} wallets to the pool")
+        except Exception:
+            logging.exception("Error filling wallet pool")
+        await asyncio.sleep(wallet_pool_refill_interval)
@@ -15,6 +15,10 @@ TONAPI_API_KEY = os.getenv("TONAPI_API_KEY")
 
 DATABASE_URL = os.getenv("DATABASE_URL")
 
+DATABASE_REPLICA_URLS = [
+    url for url in os.getenv("DATABASE_REPLICA_URLS", "").split(",") if url
+]
+
 REDIS_URL = os.getenv("REDIS_URL")
 
 FERNET_KEY = os.getenv("FERNET_KEY").encode("utf-8")
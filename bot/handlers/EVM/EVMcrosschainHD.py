@@ -1,3 +1,4 @@
+import asyncio
 import logging
 import re
 import sys
@@ -16,6 +17,7 @@ from bot.config import (
     chain_id_to_tx_scan_url,
     evm_native_coin,
 )
+from bot.db.journal import journal
 from bot.db.models import EvmCrosschainSwap
 from bot.db.queries import get_user_by_id, registration
 from bot.keyboards.evmKB import (
@@ -25,7 +27,9 @@ from bot.keyboards.evmKB import (
 )
 from bot.keyboards.menuKB import cancel_kb, confirm_kb, menu_kb
 from bot.trading.EVM.crosschain import crosschain_swap
+from bot.utils.balance_refresh import after_evm_trade
 from bot.utils.balances import fetch_erc20_balances, get_balance
+from bot.utils.signer import get_evm_signer
 from bot.utils.token_details import get_evm_token_decimals
 
 router = Router()
@@ -190,13 +194,15 @@ async def set_amount(message: Message, state: FSMContext, db: AsyncSession) -> N
         user = await get_user_by_id(db, message.from_user.id) or await registration(db, message.from_user.id, message)
 
         if user:
-            current_balance = await get_balance(
-                current_state.get("from_chain"),
-                user.evm_wallet.address,
-                current_state.get("from_token"),
-            )
-            decimals = await get_evm_token_decimals(
-                current_state.get("from_chain"), current_state.get("from_token")
+            current_balance, decimals = await asyncio.gather(
+                get_balance(
+                    current_state.get("from_chain"),
+                    user.evm_wallet.address,
+                    current_state.get("from_token"),
+                ),
+                get_evm_token_decimals(
+                    current_state.get("from_chain"), current_state.get("from_token")
+                ),
             )
             if current_balance < int(amount * (10**decimals)):
                 await message.answer(
@@ -272,7 +278,7 @@ async def confirm_crosschain_swap(
         if user:
             swap_data = await state.get_data()
             tx_hash = await crosschain_swap(
-                encrypted_key=user.evm_wallet.encrypted_private_key,
+                account=get_evm_signer(user.id, user.evm_wallet.encrypted_private_key),
                 from_chain_id=swap_data["from_chain"],
                 to_chain_id=swap_data["to_chain"],
                 amount=str(swap_data["amount"]),
@@ -284,7 +290,13 @@ async def confirm_crosschain_swap(
             )
 
             if tx_hash["ok"]:
-                db.add(
+                after_evm_trade(
+                    swap_data["from_chain"],
+                    user.evm_wallet.address,
+                    [swap_data["from_token"]],
+                    tx_hash["tx_hash"],
+                )
+                await journal(
                     EvmCrosschainSwap.create_swap(
                         user_id=user.id,
                         from_chain_id=swap_data["from_chain"],
@@ -298,7 +310,6 @@ async def confirm_crosschain_swap(
                         tx_hash=tx_hash["tx_hash"],
                     )
                 )
-                await db.commit()
                 await callback.message.answer(
                     f"Crosschain swap initiated! Transaction hash: {html.code(tx_hash.get('tx_hash'))}\n\n{chain_id_to_tx_scan_url.get(swap_data.get('from_chain'))}{tx_hash.get('tx_hash')}",
                     reply_markup=menu_kb(),
@@ -1,3 +1,4 @@
+import asyncio
 import logging
 import re
 import sys
@@ -10,12 +11,14 @@ from eth_utils.address import is_address
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from bot.config import chain_id_to_name
+from bot.db.journal import journal
 from bot.db.queries import get_user_by_id, registration
 from bot.keyboards.evmKB import limit_chain_kb, limit_from_token_kb, limit_yes_no_kb
 from bot.keyboards.menuKB import cancel_kb, confirm_kb, menu_kb
 from bot.trading.EVM.limit import create_limit_order
 from bot.utils.balances import fetch_erc20_balances, get_balance
-from bot.utils.token_details import get_evm_token_decimals
+from bot.utils.signer import get_evm_signer
+from bot.utils.token_details import get_evm_token_decimals, get_token_metadata
 
 router = Router()
 
@@ -141,14 +144,20 @@ async def set_making_amount(message: Message, state: FSMContext, db: AsyncSessio
         user = await get_user_by_id(db, message.from_user.id) or await registration(db, message.from_user.id, message)
 
         if user:
-            current_balance = await get_balance(
-                current_state.get("chain_id"),
-                user.evm_wallet.address,
-                current_state.get("maker_token"),
-            )
-            decimals = await get_evm_token_decimals(
-                current_state.get("chain_id"), current_state.get("maker_token")
+            # one multicall for both tokens; the taker token's decimals are
+            # cached for the next two steps
+            current_balance, metadata = await asyncio.gather(
+                get_balance(
+                    current_state.get("chain_id"),
+                    user.evm_wallet.address,
+                    current_state.get("maker_token"),
+                ),
+                get_token_metadata(
+                    current_state.get("chain_id"),
+                    [current_state.get("maker_token"), current_state.get("taker_token")],
+                ),
             )
+            decimals = metadata[current_state.get("maker_token")]["decimals"]
             if current_balance < int(amount * (10**decimals)):
                 await message.answer(
                     "Your balance doesn't match with your expectations",
@@ -273,10 +282,9 @@ async def confirm_limit_order(
         user = await get_user_by_id(db, callback.from_user.id) or await registration(db, callback.from_user.id, callback.message)
         if user:
             order_data = await state.get_data()
-            order_hash = await create_limit_order(
-                db=db,
+            limit_order = await create_limit_order(
                 user_id=callback.from_user.id,
-                encrypted_key=user.evm_wallet.encrypted_private_key,
+                account=get_evm_signer(user.id, user.evm_wallet.encrypted_private_key),
                 chain_id=order_data.get("chain_id"),
                 user_wallet=user.evm_wallet.address,
                 maker_token=order_data.get("maker_token"),
@@ -287,9 +295,10 @@ async def confirm_limit_order(
                 deadline_hours=order_data.get("deadline_hours"),
                 partially_able=order_data.get("partially_able"),
             )
-            if order_hash:
+            if limit_order:
+                await journal(limit_order)
                 await callback.message.answer(
-                    f"Limit order created! Order hash: {html.code(order_hash)}",
+                    f"Limit order created! Order hash: {html.code(limit_order.order_hash)}",
                     reply_markup=menu_kb(),
                 )  # \n Cancel: /cancel_limit {htmlescape('<order_hash>')}"
             else:
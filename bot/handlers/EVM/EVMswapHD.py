@@ -1,3 +1,4 @@
+import asyncio
 import logging
 import re
 import sys
@@ -15,12 +16,16 @@ from bot.config import (
     chain_id_to_tx_scan_url,
     evm_native_coin,
 )
+from bot.db.journal import journal
 from bot.db.models import EVMSwap
 from bot.db.queries import get_user_by_id, registration
 from bot.keyboards.evmKB import swap_chain_kb, swap_from_token_kb
 from bot.keyboards.menuKB import cancel_kb, confirm_kb, menu_kb
 from bot.trading.EVM.swap import swap
+from bot.utils.balance_refresh import after_evm_trade
 from bot.utils.balances import fetch_erc20_balances, get_balance
+from bot.utils.quotes import get_swap_quote
+from bot.utils.signer import get_evm_signer
 from bot.utils.token_details import get_evm_token_decimals
 
 router = Router()
@@ -151,13 +156,15 @@ async def set_amount(message: Message, state: FSMContext, db: AsyncSession) -> N
         user = await get_user_by_id(db, message.from_user.id) or await registration(db, message.from_user.id, message)
 
         if user:
-            current_balance = await get_balance(
-                current_state.get("chain_id"),
-                user.evm_wallet.address,
-                current_state.get("from_token"),
-            )
-            decimals = await get_evm_token_decimals(
-                current_state.get("chain_id"), current_state.get("from_token")
+            current_balance, decimals = await asyncio.gather(
+                get_balance(
+                    current_state.get("chain_id"),
+                    user.evm_wallet.address,
+                    current_state.get("from_token"),
+                ),
+                get_evm_token_decimals(
+                    current_state.get("chain_id"), current_state.get("from_token")
+                ),
             )
             if current_balance < int(amount * (10**decimals)):
                 await message.answer(
@@ -202,6 +209,34 @@ async def set_slippage_percent(message: Message, state: FSMContext) -> None:
         logging.exception(f"Error in {sys._getframe().f_code.co_name}: {e}")
 
 
+async def swap_preview(swap_data: dict) -> str:
+    try:
+        quote = await get_swap_quote(
+            swap_data.get("chain_id"),
+            swap_data.get("from_token"),
+            swap_data.get("to_token"),
+            swap_data.get("amount"),
+        )
+        if not quote.ok or not quote.first:
+            return ""
+        to_token = quote.first.get("toToken", {})
+        decimals = int(to_token.get("decimal", 0))
+        # quotes are shared per amount bucket, so scale to the exact amount
+        quoted_amount = int(quote.first.get("fromTokenAmount") or swap_data["amount"])
+        to_amount = (
+            int(quote.first["toTokenAmount"])
+            * int(swap_data["amount"])
+            / quoted_amount
+            / (10**decimals)
+        )
+        return (
+            f"You will receive ≈ {to_amount:.6g} {to_token.get('tokenSymbol', '')}\n\n"
+        )
+    except Exception as e:
+        logging.exception(f"Error in {sys._getframe().f_code.co_name}: {e}")
+        return ""
+
+
 @router.message(
     SwapState.price_impact_percent, F.text.regexp(re.compile(r"^\d+([.,]\d+)?$"))
 )
@@ -210,7 +245,11 @@ async def set_price_impact_percent(message: Message, state: FSMContext) -> None:
         price_impact = float(message.text.replace(",", "."))
 
         if 0.1 <= price_impact <= 51:
-            await message.answer("Confirm the swap:", reply_markup=confirm_kb())
+            current_state = await state.get_data()
+            await message.answer(
+                f"{await swap_preview(current_state)}Confirm the swap:",
+                reply_markup=confirm_kb(),
+            )
             await state.update_data(price_impact_percent=price_impact)
             await state.set_state(SwapState.confirm)
         else:
@@ -233,7 +272,7 @@ async def confirm_swap(
         if user:
             swap_data = await state.get_data()
             tx_hash = await swap(
-                encrypted_key=user.evm_wallet.encrypted_private_key,
+                account=get_evm_signer(user.id, user.evm_wallet.encrypted_private_key),
                 chain_id=swap_data.get("chain_id"),
                 amount=swap_data.get("amount"),
                 from_token=swap_data.get("from_token"),
@@ -247,7 +286,13 @@ async def confirm_swap(
                     f"Swap tx initiated\n{html.code(tx_hash)}\n\n{chain_id_to_tx_scan_url.get(swap_data.get('chain_id'))}{tx_hash}",
                     reply_markup=menu_kb(),
                 )
-                db.add(
+                after_evm_trade(
+                    swap_data.get("chain_id"),
+                    user.evm_wallet.address,
+                    [swap_data.get("from_token"), swap_data.get("to_token")],
+                    tx_hash,
+                )
+                await journal(
                     EVMSwap.create_swap(
                         user_id=callback.from_user.id,
                         chain_id=swap_data.get("chain_id"),
@@ -257,7 +302,6 @@ async def confirm_swap(
                         tx_hash=tx_hash,
                     )
                 )
-                await db.commit()
             else:
                 await callback.answer("Swap failure")
         else:
@@ -1,3 +1,4 @@
+import asyncio
 import logging
 import re
 import sys
@@ -18,7 +19,9 @@ from bot.db.queries import get_user_by_id, registration
 from bot.keyboards.evmKB import withdraw_chain_kb, withdraw_token_kb
 from bot.keyboards.menuKB import cancel_kb, confirm_kb, menu_kb
 from bot.trading.EVM.withdraw import send
+from bot.utils.balance_refresh import after_evm_trade
 from bot.utils.balances import fetch_erc20_balances, get_balance
+from bot.utils.signer import get_evm_signer
 from bot.utils.token_details import get_evm_token_decimals
 
 router = Router()
@@ -135,9 +138,10 @@ async def set_amount(message: Message, state: FSMContext, db: AsyncSession):
         token_address = current_state.get("token_address")
         user = await get_user_by_id(db, message.from_user.id) or await registration(db, message.from_user.id, message)
         user_wallet = user.evm_wallet.address
-        decimals = await get_evm_token_decimals(chain_id, token_address)
-
-        balance = await get_balance(chain_id, user_wallet, token_address)
+        decimals, balance = await asyncio.gather(
+            get_evm_token_decimals(chain_id, token_address),
+            get_balance(chain_id, user_wallet, token_address),
+        )
         if balance < int(amount * (10**decimals)):
             await message.answer(
                 "Your balance is insufficient for this withdrawal.",
@@ -179,12 +183,12 @@ async def confirm_withdraw(
         token_address = current_state.get("token_address")
         amount = current_state.get("amount")
         user = await get_user_by_id(db, callback.from_user.id) or await registration(db, callback.from_user.id, callback.message)
-        encrypted_key = user.evm_wallet.encrypted_private_key
+        account = get_evm_signer(user.id, user.evm_wallet.encrypted_private_key)
         to_wallet = current_state.get("recipient")
 
         tx_hash = await send(
             wallet=user.evm_wallet.address,
-            encrypted_key=encrypted_key,
+            account=account,
             chain_id=chain_id,
             amount=amount,
             token_address=token_address,
@@ -192,6 +196,7 @@ async def confirm_withdraw(
         )
 
         if tx_hash:
+            after_evm_trade(chain_id, user.evm_wallet.address, [token_address], tx_hash)
             await callback.message.answer(
                 f"Withdrawal initiated. Transaction hash: {html.code(tx_hash)}\n\n{chain_id_to_tx_scan_url.get(chain_id)}{tx_hash}",
                 reply_markup=menu_kb(),
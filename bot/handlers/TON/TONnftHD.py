@@ -12,6 +12,7 @@ from bot.db.queries import get_user_by_id, registration
 from bot.keyboards.menuKB import cancel_kb, confirm_kb, menu_kb
 from bot.trading.TON.ton_nft import buy_nft
 from bot.utils.balances import get_ton_balance
+from bot.utils.signer import get_ton_keypair
 from bot.utils.token_details import ton_address_validation
 
 router = Router()
@@ -110,7 +111,7 @@ async def confirm_purchase(
 
         nft_data = await state.get_data()
         tx_hash = await buy_nft(
-            encrypted_mnemonic=user.ton_wallet.encrypted_mnemonic,
+            keypair=get_ton_keypair(user.id, user.ton_wallet.encrypted_mnemonic),
             collection=nft_data.get("collection"),
             to_price=nft_data.get("to_price"),
         )
@@ -9,16 +9,19 @@ from aiogram.types import CallbackQuery, Message
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from bot.config import ton_native_coin
+from bot.db.journal import journal
 from bot.db.models import TONSwap
 from bot.db.queries import get_user_by_id, registration
 from bot.keyboards.menuKB import cancel_kb, confirm_kb, menu_kb
 from bot.keyboards.tonKB import ton_swap_from_token_kb
 from bot.trading.TON.swap import jetton_to_jetton, jetton_to_ton, ton_to_jetton
+from bot.utils.balance_refresh import after_ton_trade
 from bot.utils.balances import (
     fetch_jetton_balances,
     get_jetton_balance,
     get_ton_balance,
 )
+from bot.utils.signer import get_ton_keypair
 from bot.utils.token_details import get_jetton_decimals, ton_address_validation
 
 router = Router()
@@ -196,20 +199,26 @@ async def confirm_swap(
                 and swap_data.get("to_token").upper() != ton_native_coin
             ):
                 tx_hash = await jetton_to_jetton(
-                    encrypted_mnemonic=user.ton_wallet.encrypted_mnemonic,
+                    keypair=get_ton_keypair(
+                        user.id, user.ton_wallet.encrypted_mnemonic
+                    ),
                     from_token=swap_data.get("from_token"),
                     to_token=swap_data.get("to_token"),
                     amount=swap_data.get("amount"),
                 )
             elif swap_data.get("from_token").upper() == ton_native_coin:
                 tx_hash = await ton_to_jetton(
-                    encrypted_mnemonic=user.ton_wallet.encrypted_mnemonic,
+                    keypair=get_ton_keypair(
+                        user.id, user.ton_wallet.encrypted_mnemonic
+                    ),
                     token=swap_data.get("to_token"),
                     amount=swap_data.get("amount"),
                 )
             elif swap_data.get("to_token").upper() == ton_native_coin:
                 tx_hash = await jetton_to_ton(
-                    encrypted_mnemonic=user.ton_wallet.encrypted_mnemonic,
+                    keypair=get_ton_keypair(
+                        user.id, user.ton_wallet.encrypted_mnemonic
+                    ),
                     token=swap_data.get("from_token"),
                     amount=swap_data.get("amount"),
                 )
@@ -217,11 +226,16 @@ async def confirm_swap(
                 await callback.answer("Unsupported swap")
                 return
             if tx_hash:
+                after_ton_trade(
+                    user.ton_wallet.address,
+                    [swap_data.get("from_token"), swap_data.get("to_token")],
+                    tx_hash,
+                )
                 await callback.message.answer(
                     f"Swap tx initiated\nhttps://tonviewer.com/transaction/{tx_hash}",
                     reply_markup=menu_kb(),
                 )
-                db.add(
+                await journal(
                     TONSwap.create_swap(
                         user_id=callback.from_user.id,
                         amount=swap_data.get("amount"),
@@ -229,7 +243,6 @@ async def confirm_swap(
                         to_token=swap_data.get("to_token"),
                     )
                 )
-                await db.commit()
             else:
                 await callback.answer("Swap failure")
         else:
@@ -12,7 +12,9 @@ from bot.db.queries import get_user_by_id, registration
 from bot.keyboards.menuKB import cancel_kb, confirm_kb, menu_kb
 from bot.keyboards.tonKB import ton_withdraw_token_kb
 from bot.trading.TON.withdraw import send, send_jetton
+from bot.utils.balance_refresh import after_ton_trade
 from bot.utils.balances import fetch_jetton_balances, get_ton_balance
+from bot.utils.signer import get_ton_keypair
 from bot.utils.token_details import get_jetton_decimals, ton_address_validation
 
 router = Router()
@@ -129,7 +131,7 @@ async def confirm_withdraw(
 
         if token.upper() == ton_native_coin:
             tx_hash = await send(
-                encrypted_mnemonic=user.ton_wallet.encrypted_mnemonic,
+                keypair=get_ton_keypair(user.id, user.ton_wallet.encrypted_mnemonic),
                 destination=destination,
                 amount=amount,
             )
@@ -137,7 +139,9 @@ async def confirm_withdraw(
             decimals = get_jetton_decimals(token)
             if decimals:
                 tx_hash = await send_jetton(
-                    encrypted_mnemonic=user.ton_wallet.encrypted_mnemonic,
+                    keypair=get_ton_keypair(
+                        user.id, user.ton_wallet.encrypted_mnemonic
+                    ),
                     destination=destination,
                     jetton_amount=amount,
                     jetton_master_address=token,
@@ -148,6 +152,7 @@ async def confirm_withdraw(
                 return
 
         if tx_hash:
+            after_ton_trade(user.ton_wallet.address, [token], tx_hash)
             await callback.message.answer(
                 f"Withdrawal initiated\nhttps://tonviewer.com/transaction/{tx_hash}",
                 reply_markup=menu_kb(),
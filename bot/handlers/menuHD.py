@@ -11,6 +11,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from bot.config import bot_name
 from bot.db.queries import (
+    get_referrals_count,
     get_user_by_id,
     registration
 )
@@ -19,6 +20,7 @@ from bot.keyboards.menuKB import main_menu_kb, menu_kb
 from bot.keyboards.tonKB import ton_menu_kb
 from bot.utils.balances import fetch_jetton_balances
 from bot.utils.dex import decrypt_key, decrypt_mnemonic
+from bot.utils.portfolio import format_portfolio, get_portfolio
 
 router = Router()
 
@@ -106,12 +108,31 @@ async def callback_wallets_ton(callback: CallbackQuery, db: AsyncSession):
         logging.exception(f"Error in {sys._getframe().f_code.co_name}")
 
 
+@router.callback_query(F.data == "portfolio")
+async def callback_portfolio(callback: CallbackQuery, db: AsyncSession):
+    try:
+        user = await get_user_by_id(db, callback.from_user.id) or await registration(db, callback.from_user.id, callback.message)
+        if user:
+            portfolio = await get_portfolio(
+                user.evm_wallet.address, user.ton_wallet.address
+            )
+            await callback.message.answer(
+                format_portfolio(portfolio),
+                reply_markup=menu_kb(),
+            )
+        else:
+            await callback.answer("User not found")
+    except Exception:
+        logging.exception(f"Error in {sys._getframe().f_code.co_name}")
+
+
 @router.callback_query(F.data == "ref")
-async def callback_referral(callback: CallbackQuery):
+async def callback_referral(callback: CallbackQuery, db: AsyncSession):
     try:
         referral_link = f"https://t.me/{bot_name}?start=id_{callback.from_user.id}"
+        referrals_count = await get_referrals_count(db, callback.from_user.id)
         await callback.message.answer(
-            text=f"Your referral link: <code>{referral_link}</code>",
+            text=f"Your referral link: <code>{referral_link}</code>\nInvited users: {referrals_count}",
             reply_markup=menu_kb(),
         )
 
@@ -5,6 +5,7 @@ def main_menu_kb():
     buttons = [
         [InlineKeyboardButton(text="EVM wallet", callback_data="wallets_evm")],
         [InlineKeyboardButton(text="TON wallet", callback_data="wallets_ton")],
+        [InlineKeyboardButton(text="Portfolio", callback_data="portfolio")],
         [InlineKeyboardButton(text="👥", callback_data="ref")],
     ]
     keyboard = InlineKeyboardMarkup(inline_keyboard=buttons)
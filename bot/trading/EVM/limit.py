@@ -1,28 +1,27 @@
-import asyncio
-import json
 import logging
 import time
 
-import aiohttp
+from eth_account.signers.local import LocalAccount
 from eth_utils import to_checksum_address
 from web3 import AsyncWeb3
 
 from bot.config import (
     ZERO_ADDRESS,
-    api_base_url,
     cancel_limit_abi,
-    chain_id_to_rpc_url,
     limit_approval_contract,
     limit_dex_router,
     limit_order_type,
 )
 from bot.db.models import EVMLimitOrder
-from bot.utils.dex import decrypt_key, get_headers_params, send_approve_tx
+from bot.utils.dex import send_approve_tx
+from bot.utils.okx import okx
+from bot.utils.providers import get_web3
+from bot.utils.signer import sign_typed_data
 
 
 async def sign_limit_order(
     web3: AsyncWeb3,
-    private_key,
+    account: LocalAccount,
     chain_id,
     verifying_contract,
     salt,
@@ -67,9 +66,7 @@ async def sign_limit_order(
                 "partiallyAble": partially_able,
             },
         }
-        signature = await asyncio.to_thread(
-            web3.eth.account.sign_typed_data, private_key, full_message=full_message
-        )
+        signature = await sign_typed_data(account, full_message)
         return {
             "orderHash": signature.messageHash.hex(),
             "signature": signature.signature.hex(),
@@ -81,41 +78,23 @@ async def sign_limit_order(
         raise
 
 
-async def send_limit_order(session, limit_order_request_params: dict):
-    url = f"{api_base_url}/aggregator/limit-order/save-order"
-    headers = get_headers_params(
-        "POST",
-        "aggregator",
-        "/limit-order/save-order",
-        body=json.dumps(limit_order_request_params),
-    )
-
+async def send_limit_order(limit_order_request_params: dict):
     try:
-        async with session.post(
-            url, headers=headers, data=json.dumps(limit_order_request_params)
-        ) as response:
-            if response.status == 200:
-                response_data = await response.json()
-                if response_data.get("code") == "0":
-                    return True
-                else:
-                    logging.error(f"Error response: {response_data}")
-                    raise Exception(f"Error: {response_data}")
-            else:
-                response_text = await response.text()
-                logging.error(
-                    f"Request failed with status {response.status}: {response_text}"
-                )
-                raise Exception(f"Error {response.status}: {response_text}")
+        response = await okx.post(
+            "/aggregator/limit-order/save-order", limit_order_request_params
+        )
+        if not response.ok:
+            logging.error(f"Error response: {response}")
+        response.raise_for_error()
+        return True
     except Exception:
         logging.exception("Error occurred in send_limit_order function")
         raise
 
 
 async def create_limit_order(
-    db,
     user_id,
-    encrypted_key: str,
+    account: LocalAccount,
     chain_id: int,
     user_wallet: str,
     maker_token: str,
@@ -127,77 +106,63 @@ async def create_limit_order(
     partially_able: bool,
 ):
     try:
-        rpc_url = chain_id_to_rpc_url.get(chain_id)
         spender_address = limit_approval_contract.get(chain_id)
         verifying_contract = limit_dex_router.get(chain_id)
 
-        if not rpc_url or not spender_address or not verifying_contract:
+        if not spender_address or not verifying_contract:
             raise ValueError(f"Unsupported chain ID: {chain_id}")
 
-        web3 = AsyncWeb3(AsyncWeb3.AsyncHTTPProvider(rpc_url))
-        if not await web3.is_connected():
-            raise ConnectionError()
-
-        private_key = decrypt_key(encrypted_key)
+        web3 = get_web3(chain_id)
         user_wallet = to_checksum_address(user_wallet)
         maker_token = to_checksum_address(maker_token)
         taker_token = to_checksum_address(taker_token)
 
-        async with aiohttp.ClientSession() as session:
-            await send_approve_tx(
-                session,
-                web3,
-                user_wallet,
-                spender_address,
-                maker_token,
-                making_amount,
-                private_key,
-                rpc_url,
-                chain_id,
-            )
-            salt = int(time.time())
-            deadline = int(int(time.time()) + int((deadline_hours * 3600)))
-
-            signature_params = await sign_limit_order(
-                web3=web3,
-                private_key=private_key,
-                chain_id=chain_id,
-                verifying_contract=verifying_contract,
-                salt=salt,
-                maker_token=maker_token,
-                taker_token=taker_token,
-                maker=user_wallet,
-                making_amount=making_amount,
-                taking_amount=taking_amount,
-                min_return=min_return,
-                deadline=deadline,
-                partially_able=partially_able,
-            )
-
-            if signature_params:
-                res = await send_limit_order(
-                    session, limit_order_request_params=signature_params
+        await send_approve_tx(
+            web3,
+            user_wallet,
+            spender_address,
+            maker_token,
+            making_amount,
+            account,
+            chain_id,
+        )
+        salt = int(time.time())
+        deadline = int(int(time.time()) + int((deadline_hours * 3600)))
+
+        signature_params = await sign_limit_order(
+            web3=web3,
+            account=account,
+            chain_id=chain_id,
+            verifying_contract=verifying_contract,
+            salt=salt,
+            maker_token=maker_token,
+            taker_token=taker_token,
+            maker=user_wallet,
+            making_amount=making_amount,
+            taking_amount=taking_amount,
+            min_return=min_return,
+            deadline=deadline,
+            partially_able=partially_able,
+        )
+
+        if signature_params:
+            res = await send_limit_order(limit_order_request_params=signature_params)
+            if res:
+                return EVMLimitOrder.create_limit(
+                    chain_id=chain_id,
+                    user_id=user_id,
+                    salt=salt,
+                    maker_token=maker_token,
+                    taker_token=taker_token,
+                    maker=user_wallet,
+                    allowed_sender=ZERO_ADDRESS,
+                    making_amount=making_amount,
+                    taking_amount=taking_amount,
+                    min_return=min_return,
+                    deadline=deadline,
+                    partially_able=partially_able,
+                    order_hash=signature_params.get("orderHash"),
                 )
-                if res:
-                    db.add(
-                        EVMLimitOrder.create_limit(
-                            chain_id=chain_id,
-                            user_id=user_id,
-                            salt=salt,
-                            maker_token=maker_token,
-                            taker_token=taker_token,
-                            maker=user_wallet,
-                            allowed_sender=ZERO_ADDRESS,
-                            making_amount=making_amount,
-                            taking_amount=taking_amount,
-                            min_return=min_return,
-                            deadline=deadline,
-                            partially_able=partially_able,
-                            order_hash=signature_params.get("orderHash"),
-                        )
-                    )
-                    await db.commit()
-                    return signature_params.get("orderHash")
         return False
     except Exception:
         logging.exception("Error occurred in create_limit_order function")
@@ -1,36 +1,28 @@
 import logging
 
-import aiohttp
+from eth_account.signers.local import LocalAccount
 from eth_utils import to_checksum_address
-from web3 import AsyncWeb3
-
 from bot.config import (
     approval_contract_addresses,
-    chain_id_to_rpc_url,
     evm_native_coin,
     gas_ratio,
 )
-from bot.utils.dex import (
-    decrypt_key,
-    get_aggregator_request_url,
-    get_headers_params,
-    get_transaction_count,
-    send_approve_tx,
-)
+from bot.utils.dex import broadcast, send_approve_tx
+from bot.utils.nonce import reserved_nonce
+from bot.utils.okx import okx
+from bot.utils.providers import get_web3
+from bot.utils.signer import sign_transaction
 
 
-async def get_swap_data(session, req_body, headers):
-    url = get_aggregator_request_url("/swap", req_body)
-    async with session.get(url, headers=headers) as response:
-        if response.status != 200:
-            error_text = await response.text()
-            logging.error(f"Request failed with status {response.status}: {error_text}")
-            raise Exception(f"Request failed with status {response.status}")
-        return await response.json()
+async def get_swap_data(req_body):
+    response = await okx.get("/aggregator/swap", req_body)
+    if not response.ok:
+        logging.error(f"Swap request failed: {response}")
+    return response.raise_for_error().first
 
 
 async def swap(
-    encrypted_key: str,
+    account: LocalAccount,
     chain_id: int,
     amount: str,
     from_token: str,
@@ -47,15 +39,11 @@ async def swap(
         to_token = to_checksum_address(to_token)
         wallet_address = to_checksum_address(wallet_address)
 
-        private_key = decrypt_key(encrypted_key)
-        rpc_url = chain_id_to_rpc_url.get(chain_id)
         spender_address = approval_contract_addresses.get(chain_id)
-        if not rpc_url or not spender_address:
+        if not spender_address:
             raise ValueError(f"Unsupported chain ID: {chain_id}")
 
-        web3 = AsyncWeb3(AsyncWeb3.AsyncHTTPProvider(rpc_url))
-        if not await web3.is_connected():
-            raise ConnectionError()
+        web3 = get_web3(chain_id)
 
         req_body = {
             "chainId": str(chain_id),
@@ -67,36 +55,21 @@ async def swap(
             "priceImpactProtectionPercentage": price_impact,
         }
 
-        async with aiohttp.ClientSession() as session:
-            if from_token.lower() != evm_native_coin.lower():
-                approve_res = await send_approve_tx(
-                    session,
-                    web3,
-                    wallet_address,
-                    spender_address,
-                    from_token,
-                    amount,
-                    private_key,
-                    rpc_url,
-                    chain_id,
-                )
-                nonce = await get_transaction_count(
-                    wallet_address, "pending", rpc_url, web3
-                )
-                approve_nonce = approve_res.get("nonce")
-
-                if approve_res.get("ok") and nonce <= approve_nonce:
-                    nonce = approve_nonce + 1
-            else:
-                nonce = await get_transaction_count(
-                    wallet_address, "pending", rpc_url, web3
-                )
-
-            
+        if from_token.lower() != evm_native_coin.lower():
+            await send_approve_tx(
+                web3,
+                wallet_address,
+                spender_address,
+                from_token,
+                amount,
+                account,
+                chain_id,
+                wait_for_receipt=False,
+            )
 
-            headers = get_headers_params("GET", "aggregator", "/swap", req_body)
-            swap_data = await get_swap_data(session, req_body, headers)
-            swap_tx_info = swap_data["data"][0]["tx"]
+        swap_data = await get_swap_data(req_body)
+        swap_tx_info = swap_data["tx"]
+        async with reserved_nonce(web3, chain_id, wallet_address) as nonce:
             tx_object = {
                 "data": swap_tx_info["data"],
                 "gas": int(int(swap_tx_info["gas"]) * gas_ratio),
@@ -107,9 +80,9 @@ async def swap(
                 "chainId": chain_id,
             }
 
-            signed_tx = web3.eth.account.sign_transaction(tx_object, private_key)
-            tx_hash = await web3.eth.send_raw_transaction(signed_tx.raw_transaction)
-            return web3.to_hex(tx_hash)
+            signed_tx = await sign_transaction(account, tx_object)
+            tx_hash = await broadcast(web3, signed_tx)
+        return web3.to_hex(tx_hash)
     except Exception:
         logging.exception("Error occurred in swap function")
         raise
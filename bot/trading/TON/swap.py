@@ -1,7 +1,6 @@
 import logging
 import sys
 
-import aiohttp
 from pytoniq_core import Address
 from tonutils.client import TonapiClient
 from tonutils.jetton.dex.stonfi import StonfiRouterV2
@@ -10,7 +9,7 @@ from tonutils.utils import to_amount
 from tonutils.wallet import WalletV4R2
 
 from bot.env import TONAPI_API_KEY
-from bot.utils.dex import decrypt_mnemonic
+from bot.utils.http import get_session
 
 
 async def get_router_address(from_token: str, to_token: str, amount: int) -> str:
@@ -24,23 +23,21 @@ async def get_router_address(from_token: str, to_token: str, amount: int) -> str
         "dex_v2": "true",
     }
 
-    async with aiohttp.ClientSession() as session:
-        async with session.post(url, params=params, headers=headers) as response:
-            if response.status == 200:
-                content = await response.json()
-                return content.get("router_address")
-            else:
-                error_text = await response.text()
-                raise Exception(
-                    f"Failed to get router address: {response.status}: {error_text}"
-                )
+    async with get_session().post(url, params=params, headers=headers) as response:
+        if response.status == 200:
+            content = await response.json()
+            return content.get("router_address")
+        else:
+            error_text = await response.text()
+            raise Exception(
+                f"Failed to get router address: {response.status}: {error_text}"
+            )
 
 
-async def ton_to_jetton(encrypted_mnemonic: str, token: str, amount: int):
+async def ton_to_jetton(keypair: tuple[bytes, bytes], token: str, amount: int):
     try:
-        mnemonic = decrypt_mnemonic(encrypted_mnemonic).split()
         client = TonapiClient(api_key=TONAPI_API_KEY, is_testnet=False)
-        wallet, _, _, _ = WalletV4R2.from_mnemonic(client, mnemonic)
+        wallet = WalletV4R2(client, *keypair)
 
         router_address = await get_router_address(PTONAddresses.MAINNET, token, amount)
         stonfi_router = StonfiRouterV2(client, router_address=router_address)
@@ -65,11 +62,10 @@ async def ton_to_jetton(encrypted_mnemonic: str, token: str, amount: int):
         raise
 
 
-async def jetton_to_ton(encrypted_mnemonic: str, token: str, amount: int):
+async def jetton_to_ton(keypair: tuple[bytes, bytes], token: str, amount: int):
     try:
-        mnemonic = decrypt_mnemonic(encrypted_mnemonic).split()
         client = TonapiClient(api_key=TONAPI_API_KEY, is_testnet=False)
-        wallet, _, _, _ = WalletV4R2.from_mnemonic(client, mnemonic)
+        wallet = WalletV4R2(client, *keypair)
 
         router_address = await get_router_address(token, PTONAddresses.MAINNET, amount)
         stonfi_router = StonfiRouterV2(client, router_address=router_address)
@@ -96,12 +92,11 @@ async def jetton_to_ton(encrypted_mnemonic: str, token: str, amount: int):
 
 
 async def jetton_to_jetton(
-    encrypted_mnemonic: str, from_token: str, to_token: str, amount: int
+    keypair: tuple[bytes, bytes], from_token: str, to_token: str, amount: int
 ):
     try:
-        mnemonic = decrypt_mnemonic(encrypted_mnemonic).split()
         client = TonapiClient(api_key=TONAPI_API_KEY, is_testnet=False)
-        wallet, _, _, _ = WalletV4R2.from_mnemonic(client, mnemonic)
+        wallet = WalletV4R2(client, *keypair)
 
         router_address = await get_router_address(from_token, to_token, amount)
         stonfi_router = StonfiRouterV2(client, router_address=router_address)
@@ -5,14 +5,12 @@ from tonutils.client import ToncenterClient
 from tonutils.wallet import WalletV4R2
 
 from bot.env import TONCENTER_API_KEY
-from bot.utils.dex import decrypt_mnemonic
 
 
-async def send(encrypted_mnemonic: str, destination: str, amount: float):
+async def send(keypair: tuple[bytes, bytes], destination: str, amount: float):
     try:
-        mnemonic = decrypt_mnemonic(encrypted_mnemonic).split()
         client = ToncenterClient(api_key=TONCENTER_API_KEY, is_testnet=False)
-        wallet = WalletV4R2.from_mnemonic(client, mnemonic)[0]
+        wallet = WalletV4R2(client, *keypair)
 
         return await wallet.transfer(destination=destination, amount=amount)
 
@@ -22,16 +20,15 @@ async def send(encrypted_mnemonic: str, destination: str, amount: float):
 
 
 async def send_jetton(
-    encrypted_mnemonic: str,
+    keypair: tuple[bytes, bytes],
     destination: str,
     jetton_amount: float,
     jetton_master_address: str,
     jetton_decimals: int,
 ):
     try:
-        mnemonic = decrypt_mnemonic(encrypted_mnemonic).split()
         client = ToncenterClient(api_key=TONCENTER_API_KEY, is_testnet=False)
-        wallet = WalletV4R2.from_mnemonic(client, mnemonic)[0]
+        wallet = WalletV4R2(client, *keypair)
 
         return await wallet.transfer_jetton(
             destination=destination,
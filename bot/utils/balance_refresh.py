@@ -0,0 +1,101 @@
+import asyncio
+import logging
+import time
+from typing import Coroutine
+
+from bot.config import (
+    balance_prefetch_ttl,
+    balance_refresh_timeout,
+    evm_native_coin,
+    ton_native_coin,
+    ton_tx_poll_interval,
+)
+from bot.env import TONCENTER_API_KEY
+from bot.utils.balances import (
+    balance_key,
+    get_balance,
+    get_balances,
+    get_jetton_balance,
+    load_erc20_balances,
+    load_jetton_balances,
+    load_ton_account,
+)
+from bot.utils.http import get_session
+from bot.utils.providers import get_web3
+
+_tasks: set[asyncio.Task] = set()
+
+
+def _spawn(coro: Coroutine) -> None:
+    task = asyncio.create_task(coro)
+    _tasks.add(task)
+    task.add_done_callback(_tasks.discard)
+
+
+async def refresh_evm_balances(
+    chain_id: int, wallet_address: str, tokens: list, tx_hash: str
+) -> None:
+    tokens = list({*tokens, evm_native_coin})
+    try:
+        await get_web3(chain_id).eth.wait_for_transaction_receipt(
+            tx_hash, balance_refresh_timeout
+        )
+    except Exception:
+        logging.exception(f"Error waiting for {tx_hash} before refreshing balances")
+    try:
+        await get_balance.cache.invalidate(
+            *(balance_key(chain_id, wallet_address, token) for token in tokens)
+        )
+        # the next screen reads these from the cache instead of the RPC; a
+        # provider that has not indexed the trade yet is only trusted briefly
+        await asyncio.gather(
+            get_balances(chain_id, wallet_address, tokens, balance_prefetch_ttl),
+            load_erc20_balances.refresh(
+                wallet_address, chain_id, ttl=balance_prefetch_ttl
+            ),
+        )
+    except Exception:
+        logging.exception(f"Error refreshing balances for {wallet_address}")
+
+
+async def wait_for_ton_message(msg_hash: str) -> bool:
+    url = f"https://toncenter.com/api/v3/transactionsByMessage?msg_hash={msg_hash}&direction=in&api_key={TONCENTER_API_KEY}"
+    deadline = time.monotonic() + balance_refresh_timeout
+    while time.monotonic() < deadline:
+        try:
+            async with get_session().get(url) as response:
+                if response.status == 200 and (await response.json()).get(
+                    "transactions"
+                ):
+                    return True
+        except Exception:
+            logging.exception(f"Error polling TON message {msg_hash}")
+        await asyncio.sleep(ton_tx_poll_interval)
+    return False
+
+
+async def refresh_ton_balances(address: str, jettons: list, msg_hash: str) -> None:
+    jettons = [jetton for jetton in jettons if jetton.upper() != ton_native_coin]
+    if not await wait_for_ton_message(msg_hash):
+        logging.warning(f"TON message {msg_hash} not seen, refreshing balances anyway")
+    try:
+        await asyncio.gather(
+            load_ton_account.refresh(address, ttl=balance_prefetch_ttl),
+            load_jetton_balances.refresh(address, ttl=balance_prefetch_ttl),
+            *(
+                get_jetton_balance.refresh(address, jetton, ttl=balance_prefetch_ttl)
+                for jetton in jettons
+            ),
+        )
+    except Exception:
+        logging.exception(f"Error refreshing TON balances for {address}")
+
+
+def after_evm_trade(
+    chain_id: int, wallet_address: str, tokens: list, tx_hash: str
+) -> None:
+    _spawn(refresh_evm_balances(chain_id, wallet_address, tokens, tx_hash))
+
+
+def after_ton_trade(address: str, jettons: list, msg_hash: str) -> None:
+    _spawn(refresh_ton_balances(address, jettons, msg_hash))
@@ -1,34 +1,30 @@
 import logging
+from typing import Optional
 
-import aiohttp
 from aiogram import html
-from async_lru import alru_cache
 from eth_utils import to_checksum_address
 from pytoniq import LiteClient, WalletV4R2
-from redis.asyncio import Redis
 from tonutils.client import ToncenterClient
 from tonutils.jetton import JettonMaster, JettonWallet
-from web3 import AsyncWeb3
 
-from bot.config import chain_id_to_name, chain_id_to_rpc_url, evm_native_coin
-from bot.env import MORALIS_API_KEY, REDIS_URL, TONCENTER_API_KEY
+from bot.config import chain_id_to_name, evm_native_coin, multicall3_address
+from bot.env import MORALIS_API_KEY, TONCENTER_API_KEY
+from bot.utils.cache import cached
 from bot.utils.dex import decrypt_mnemonic
+from bot.utils.http import get_session
+from bot.utils.multicall import multicall
+from bot.utils.providers import get_web3
+from bot.utils.token_registry import TokenInfo, save_tokens
 
-redis = Redis.from_url(REDIS_URL, decode_responses=True)
 
+def balance_key(chain_id: int, wallet_address: str, token_address: str) -> str:
+    return f"{chain_id}:{wallet_address.lower()}:{token_address.lower()}"
 
-@alru_cache(maxsize=5000, ttl=10)
+
+@cached("balance", key=balance_key)
 async def get_balance(chain_id: int, wallet_address: str, token_address: str) -> int:
     try:
-        cache_key = (
-            f"balance:{chain_id}:{wallet_address.lower()}:{token_address.lower()}"
-        )
-        if (cached_balance := await redis.get(cache_key)) is not None:
-            return int(cached_balance)
-
-        web3 = AsyncWeb3(AsyncWeb3.AsyncHTTPProvider(chain_id_to_rpc_url.get(chain_id)))
-        if not await web3.is_connected():
-            raise ConnectionError("Failed to connect to RPC")
+        web3 = get_web3(chain_id)
 
         if evm_native_coin.lower() == token_address.lower():
             balance = int(
@@ -55,7 +51,6 @@ async def get_balance(chain_id: int, wallet_address: str, token_address: str) ->
                 ).call()
             )
 
-        await redis.set(cache_key, str(balance), ex=10)
         return balance
     except Exception:
         logging.exception(
@@ -64,8 +59,61 @@ async def get_balance(chain_id: int, wallet_address: str, token_address: str) ->
         raise
 
 
-@alru_cache(maxsize=5000, ttl=30)
-async def fetch_erc20_balances(address: str, chain_id: int) -> list:
+async def get_balances(
+    chain_id: int, wallet_address: str, tokens: list, ttl: float = None
+) -> dict:
+    try:
+        keys = {token: balance_key(chain_id, wallet_address, token) for token in tokens}
+        entries = await get_balance.cache.get_many(list(keys.values()))
+        balances = {
+            token: entries[key].value
+            for token, key in keys.items()
+            if key in entries and not entries[key].failed
+        }
+        missing = [token for token in tokens if token not in balances]
+        if not missing:
+            return balances
+        generations = get_balance.cache.generations(list(keys.values()))
+
+        wallet = to_checksum_address(wallet_address)
+        results = await multicall(
+            chain_id,
+            [
+                (
+                    (
+                        multicall3_address,
+                        "getEthBalance(address)",
+                        [wallet],
+                        ["uint256"],
+                    )
+                    if token.lower() == evm_native_coin.lower()
+                    else (token, "balanceOf(address)", [wallet], ["uint256"])
+                )
+                for token in missing
+            ],
+        )
+
+        fetched = {
+            token: int(balance)
+            for token, balance in zip(missing, results)
+            if balance is not None
+        }
+        await get_balance.cache.set_many(
+            {keys[token]: balance for token, balance in fetched.items()},
+            ttl=ttl,
+            generations=generations,
+        )
+        balances.update(fetched)
+        return balances
+    except Exception:
+        logging.exception(
+            f"Error getting balances for {wallet_address} on chain {chain_id}"
+        )
+        raise
+
+
+@cached("erc20_balances", key=lambda address, chain_id: f"{chain_id}:{address.lower()}")
+async def load_erc20_balances(address: str, chain_id: int) -> tuple:
     try:
         network = chain_id_to_name.get(chain_id)
         if not network:
@@ -73,109 +121,126 @@ async def fetch_erc20_balances(address: str, chain_id: int) -> list:
         URL = f"https://deep-index.moralis.io/api/v2.2/{to_checksum_address(address)}/erc20?chain={network}&exclude_spam=true"
         headers = {"accept": "application/json", "X-API-Key": MORALIS_API_KEY}
 
-        async with aiohttp.ClientSession() as session:
-            async with session.get(URL, headers=headers) as response:
-                tokens = await response.json()
-
-                result = []
-                formatted_result = ""
-                if not tokens:
-                    return result, formatted_result
-
-                for token in tokens:
-                    name = token.get("name", "")
-                    symbol = token.get("symbol", "")
-                    if not name and not symbol:
-                        continue
-
-                    token_address = token.get("token_address", "")
-                    balance = token.get("balance", "")
-                    decimals = token.get("decimals")
-
-                    if (
-                        not token_address
-                        or not balance
-                        or decimals is None
-                        or not isinstance(balance, str)
-                        or not balance.isdigit()
-                        or int(balance) <= 0
-                        or not isinstance(decimals, int)
-                        or decimals < 0
-                    ):
-                        continue
-
-                    balance = int(balance)
-                    blnce = round(balance / (10**decimals), decimals)
-                    formatted_balance = f"{blnce:.{decimals}f}"
-
-                    display_name = (
-                        f"{name}({symbol})" if name and symbol else name or symbol
-                    )
-
-                    result.append(
-                        {
-                            "name": display_name,
-                            "token_address": token_address,
-                            "balance": balance,
-                            "decimals": decimals,
-                        }
-                    )
-                    formatted_result += f"\n\n{display_name}: {formatted_balance}   \n{html.code(token_address)}"
+        async with get_session().get(URL, headers=headers) as response:
+            response.raise_for_status()
+            tokens = await response.json()
 
+            result = []
+            formatted_result = ""
+            if not tokens:
                 return result, formatted_result
+
+            token_infos = {}
+            for token in tokens:
+                name = token.get("name", "")
+                symbol = token.get("symbol", "")
+                if not name and not symbol:
+                    continue
+
+                token_address = token.get("token_address", "")
+                balance = token.get("balance", "")
+                decimals = token.get("decimals")
+
+                if (
+                    not token_address
+                    or not balance
+                    or decimals is None
+                    or not isinstance(balance, str)
+                    or not balance.isdigit()
+                    or int(balance) <= 0
+                    or not isinstance(decimals, int)
+                    or decimals < 0
+                ):
+                    continue
+
+                token_infos[token_address] = TokenInfo(
+                    decimals, symbol or None, name or None, token.get("logo") or None
+                )
+                balance = int(balance)
+                blnce = round(balance / (10**decimals), decimals)
+                formatted_balance = f"{blnce:.{decimals}f}"
+
+                display_name = (
+                    f"{name}({symbol})" if name and symbol else name or symbol
+                )
+
+                result.append(
+                    {
+                        "name": display_name,
+                        "token_address": token_address,
+                        "balance": balance,
+                        "decimals": decimals,
+                    }
+                )
+                formatted_result += f"\n\n{display_name}: {formatted_balance}   \n{html.code(token_address)}"
+
+            await save_tokens(chain_id, token_infos)
+            return result, formatted_result
     except Exception:
         logging.exception(
             f"Failed to fetch ERC20 balances for {address} on chain id {chain_id})"
         )
-        return [], ""
+        raise
 
 
-@alru_cache(maxsize=5000, ttl=30)
-async def get_ton_balance(address: str, encrypted_mnemonic: str) -> dict:
+async def fetch_erc20_balances(address: str, chain_id: int) -> tuple:
     try:
-        url = f"https://toncenter.com/api/v3/accountStates?address={address}&include_boc=false&api_key={TONCENTER_API_KEY}"
+        return await load_erc20_balances(address, chain_id)
+    except Exception:
+        return [], ""
 
-        async with aiohttp.ClientSession() as session:
-            async with session.get(url) as response:
-                if response.status != 200:
-                    return {"ok": False, "message": f"HTTP Error {response.status}"}
 
-                data = await response.json()
+@cached("ton_account")
+async def load_ton_account(address: str) -> Optional[dict]:
+    url = f"https://toncenter.com/api/v3/accountStates?address={address}&include_boc=false&api_key={TONCENTER_API_KEY}"
 
-                accounts = data.get("accounts", [])
-                if not accounts:
-                    return {
-                        "ok": False,
-                        "message": "Wallet uninitialized or not found. Send some TON(around 0.2) and try again.",
-                    }
+    async with get_session().get(url) as response:
+        if response.status != 200:
+            raise Exception(f"HTTP Error {response.status}: {await response.text()}")
+        accounts = (await response.json()).get("accounts", [])
+    if not accounts:
+        return None
+    return {
+        "status": accounts[0].get("status"),
+        "balance": int(accounts[0].get("balance", 0)),
+    }
 
-                account = accounts[0]
-                status = account.get("status")
-                balance = int(account.get("balance", 0))
-
-                if status == "uninit":
-                    if balance > 150_000_000:
-                        mnemonic = decrypt_mnemonic(encrypted_mnemonic).split()
-                        client = LiteClient.from_mainnet_config(
-                            ls_i=2, trust_level=2, timeout=15
-                        )
-                        await client.connect()
-                        wallet = await WalletV4R2.from_mnemonic(
-                            provider=client, mnemonics=mnemonic
-                        )
-                        await wallet.deploy_via_external()
-                        await client.close()
-                        return {
-                            "ok": False,
-                            "message": "Account uninitialized but has sufficient balance. Deploy try. Try to swap again in ~2 minutes.",
-                        }
-                    else:
-                        return {
-                            "ok": False,
-                            "message": "Wallet uninitialized or not found. Send some TON(around 0.2) and try again.",
-                        }
-
-                return {"ok": True, "balance": balance}
+
+async def get_ton_balance(address: str, encrypted_mnemonic: str) -> dict:
+    try:
+        account = await load_ton_account(address)
+        if account is None:
+            return {
+                "ok": False,
+                "message": "Wallet uninitialized or not found. Send some TON(around 0.2) and try again.",
+            }
+
+        status = account["status"]
+        balance = account["balance"]
+
+        if status == "uninit":
+            if balance > 150_000_000:
+                mnemonic = decrypt_mnemonic(encrypted_mnemonic).split()
+                client = LiteClient.from_mainnet_config(
+                    ls_i=2, trust_level=2, timeout=15
+                )
+                await client.connect()
+                wallet = await WalletV4R2.from_mnemonic(
+                    provider=client, mnemonics=mnemonic
+                )
+                await wallet.deploy_via_external()
+                await client.close()
+                return {
+                    "ok": False,
+                    "message": "Account uninitialized but has sufficient balance. Deploy try. Try to swap again in ~2 minutes.",
+                }
+            else:
+                return {
+                    "ok": False,
+                    "message": "Wallet uninitialized or not found. Send some TON(around 0.2) and try again.",
+                }
+
+        return {"ok": True, "balance": balance}
     except Exception as e:
         logging.exception(f"Failed to fetch TON balance for {address} : {e}")
         return {
@@ -184,7 +249,12 @@ async def get_ton_balance(address: str, encrypted_mnemonic: str) -> dict:
         }
 
 
-@alru_cache(maxsize=5000, ttl=30)
+async def fetch_ton_balance(address: str) -> int:
+    account = await load_ton_account(address)
+    return account["balance"] if account else 0
+
+
+@cached("jetton_balance")
 async def get_jetton_balance(owner, jetton_master) -> None:
     client = ToncenterClient(api_key=TONCENTER_API_KEY, is_testnet=False)
 
@@ -201,74 +271,80 @@ async def get_jetton_balance(owner, jetton_master) -> None:
     return jetton_wallet_data.balance
 
 
-@alru_cache(maxsize=5000, ttl=30)
-async def fetch_jetton_balances(owner_address: str) -> tuple:
+@cached("jetton_balances")
+async def load_jetton_balances(owner_address: str) -> tuple:
     try:
         url = f"https://toncenter.com/api/v3/jetton/wallets?owner_address={owner_address}&exclude_zero_balance=true&limit=10&offset=0&api_key={TONCENTER_API_KEY}"
 
-        async with aiohttp.ClientSession() as session:
-            async with session.get(url) as response:
-                if response.status != 200:
-                    raise Exception(
-                        f"HTTP Error {response.status}: {await response.text()}"
-                    )
-
-                data = await response.json()
-                jetton_wallets = data.get("jetton_wallets", [])
-                address_book = data.get("address_book", {})
-                metadata = data.get("metadata", {})
-
-                result = []
-                formatted_result = ""
-                if not jetton_wallets:
-                    return result, formatted_result
-
-                for wallet in jetton_wallets:
-                    raw_address = wallet.get("jetton")
-                    balance = wallet.get("balance")
-                    if (
-                        not raw_address
-                        or not balance
-                        or not balance.isdigit()
-                        or int(balance) <= 0
-                    ):
-                        continue
-
-                    token_address = address_book.get(raw_address, {}).get(
-                        "user_friendly", raw_address
-                    )
-                    token_metadata = metadata.get(raw_address, {}).get(
-                        "token_info", [{}]
-                    )[0]
-                    name = token_metadata.get("name", "")
-                    symbol = token_metadata.get("symbol", "")
-                    decimals = int(token_metadata.get("extra", {}).get("decimals", "0"))
-
-                    if decimals < 0:
-                        continue
-
-                    balance = int(balance)
-                    blnce = round(balance / (10**decimals), decimals)
-                    formatted_balance = f"{blnce:.{decimals}f}"
-
-                    display_name = (
-                        f"{name}({symbol})" if name and symbol else name or symbol
-                    )
+        async with get_session().get(url) as response:
+            if response.status != 200:
+                raise Exception(
+                    f"HTTP Error {response.status}: {await response.text()}"
+                )
 
-                    result.append(
-                        {
-                            "name": display_name,
-                            "token_address": token_address,
-                            "balance": balance,
-                            "decimals": decimals,
-                        }
-                    )
-                    formatted_result += (
-                        f"\n\n{display_name}: {formatted_balance}   \n{token_address}"
-                    )
+            data = await response.json()
+            jetton_wallets = data.get("jetton_wallets", [])
+            address_book = data.get("address_book", {})
+            metadata = data.get("metadata", {})
 
+            result = []
+            formatted_result = ""
+            if not jetton_wallets:
                 return result, formatted_result
 
+            for wallet in jetton_wallets:
+                raw_address = wallet.get("jetton")
+                balance = wallet.get("balance")
+                if (
+                    not raw_address
+                    or not balance
+                    or not balance.isdigit()
+                    or int(balance) <= 0
+                ):
+                    continue
+
+                token_address = address_book.get(raw_address, {}).get(
+                    "user_friendly", raw_address
+                )
+                token_metadata = metadata.get(raw_address, {}).get("token_info", [{}])[
+                    0
+                ]
+                name = token_metadata.get("name", "")
+                symbol = token_metadata.get("symbol", "")
+                decimals = int(token_metadata.get("extra", {}).get("decimals", "0"))
+
+                if decimals < 0:
+                    continue
+
+                balance = int(balance)
+                blnce = round(balance / (10**decimals), decimals)
+                formatted_balance = f"{blnce:.{decimals}f}"
+
+                display_name = (
+                    f"{name}({symbol})" if name and symbol else name or symbol
+                )
+
+                result.append(
+                    {
+                        "name": display_name,
+                        "token_address": token_address,
+                        "balance": balance,
+                        "decimals": decimals,
+                    }
+                )
+                formatted_result += (
+                    f"\n\n{display_name}: {formatted_balance}   \n{token_address}"
+                )
+
+            return result, formatted_result
+
     except Exception:
         logging.exception(f"Failed to fetch Jetton balances for {owner_address}")
+        raise
+
+
+async def fetch_jetton_balances(owner_address: str) -> tuple:
+    try:
+        return await load_jetton_balances(owner_address)
+    except Exception:
         return [], ""
@@ -0,0 +1,299 @@
+import asyncio
+import functools
+import json
+import logging
+import time
+import uuid
+from dataclasses import dataclass, replace
+from typing import Any, Awaitable, Callable, Optional
+
+from cachetools import LRUCache
+from redis.asyncio import Redis
+
+from bot.config import cache_settings
+from bot.env import REDIS_URL
+
+INVALIDATION_CHANNEL = "cache:invalidate"
+
+redis = Redis.from_url(REDIS_URL, decode_responses=True)
+
+# tells this process's own invalidation messages apart from everyone else's
+_origin = uuid.uuid4().hex
+
+_caches: dict[str, "TieredCache"] = {}
+
+
+class CachedFailure(Exception):
+    pass
+
+
+@dataclass(frozen=True, slots=True)
+class CacheEntry:
+    value: Any
+    failed: bool
+    fresh_until: float
+    stale_until: float
+    size: int
+
+    def result(self) -> Any:
+        if self.failed:
+            raise CachedFailure(self.value)
+        return self.value
+
+    def dumps(self) -> str:
+        return json.dumps([self.value, self.failed, self.fresh_until, self.stale_until])
+
+    @staticmethod
+    def loads(data: str) -> "CacheEntry":
+        value, failed, fresh_until, *stale_until = json.loads(data)
+        # entries written before stale_until was stored are never served stale
+        stale_until = stale_until[0] if stale_until else fresh_until
+        return CacheEntry(value, failed, fresh_until, stale_until, len(data))
+
+
+class TieredCache:
+    # L1 is a per-process LRU bounded by the serialized size of its entries,
+    # L2 is Redis shared by every process; misses for the same key share one
+    # load, stale entries are served while a single refresh runs behind them
+    # and failures are remembered for negative_ttl
+    def __init__(
+        self,
+        namespace: str,
+        ttl: float,
+        stale_ttl: float = 0,
+        negative_ttl: float = 0,
+        max_bytes: int = 1 << 20,
+    ):
+        self.namespace = namespace
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.negative_ttl = negative_ttl
+        self._local = LRUCache(maxsize=max_bytes, getsizeof=lambda entry: entry.size)
+        self._inflight: dict[str, asyncio.Task] = {}
+        # a load only writes its result back if the key was not invalidated
+        # while it ran; numbers come from one counter so an evicted key can
+        # never repeat the generation a running load started with
+        self._generation = 0
+        self._generations = LRUCache(maxsize=100_000)
+        _caches[namespace] = self
+
+    def redis_key(self, key: str) -> str:
+        return f"cache:{self.namespace}:{key}"
+
+    def _entry(self, value: Any, failed: bool, ttl: float = None) -> CacheEntry:
+        # failures, empty results and explicit short ttls are never served stale
+        stale_ttl = 0
+        if failed or value is None:
+            ttl = self.negative_ttl
+        elif ttl is None:
+            ttl, stale_ttl = self.ttl, self.stale_ttl
+        fresh_until = time.time() + ttl
+        entry = CacheEntry(value, failed, fresh_until, fresh_until + stale_ttl, 0)
+        return replace(entry, size=len(entry.dumps()))
+
+    def _remember(self, key: str, entry: CacheEntry) -> None:
+        try:
+            self._local[key] = entry
+        except ValueError:
+            # larger than the whole L1 budget
+            self._local.pop(key, None)
+
+    async def get_many(self, keys: list) -> dict:
+        now = time.time()
+        entries = {}
+        missing = []
+        for key in keys:
+            entry = self._local.get(key)
+            if entry is not None and entry.stale_until > now:
+                entries[key] = entry
+            else:
+                missing.append(key)
+        if not missing:
+            return entries
+
+        try:
+            cached = await redis.mget([self.redis_key(key) for key in missing])
+        except Exception:
+            logging.exception(f"Error reading {self.namespace} cache")
+            return entries
+        for key, data in zip(missing, cached):
+            if data is None:
+                continue
+            entry = CacheEntry.loads(data)
+            if entry.stale_until > now:
+                self._remember(key, entry)
+                entries[key] = entry
+        return entries
+
+    async def get(self, key: str) -> Optional[CacheEntry]:
+        return (await self.get_many([key])).get(key)
+
+    def generations(self, keys: list) -> dict:
+        return {key: self._generations.get(key, 0) for key in keys}
+
+    async def set_many(
+        self,
+        values: dict,
+        failed: bool = False,
+        ttl: float = None,
+        generations: dict = None,
+    ) -> None:
+        # with generations, keys invalidated since they were taken are skipped
+        entries = {
+            key: self._entry(value, failed, ttl)
+            for key, value in values.items()
+            if generations is None
+            or self._generations.get(key, 0) == generations.get(key, 0)
+        }
+        for key, entry in entries.items():
+            self._remember(key, entry)
+        if not entries:
+            return
+        try:
+            async with redis.pipeline(transaction=False) as pipe:
+                for key, entry in entries.items():
+                    pipe.set(
+                        self.redis_key(key),
+                        entry.dumps(),
+                        px=max(1, int((entry.stale_until - time.time()) * 1000)),
+                    )
+                await pipe.execute()
+        except Exception:
+            logging.exception(f"Error writing {self.namespace} cache")
+
+    async def set(
+        self,
+        key: str,
+        value: Any,
+        failed: bool = False,
+        ttl: float = None,
+        generations: dict = None,
+    ) -> None:
+        await self.set_many({key: value}, failed, ttl, generations)
+
+    def discard(self, *keys: str) -> None:
+        for key in keys:
+            self._local.pop(key, None)
+            # a load already running for the key must neither be joined nor
+            # write its result back
+            self._inflight.pop(key, None)
+            self._generation += 1
+            self._generations[key] = self._generation
+
+    async def invalidate(self, *keys: str) -> None:
+        self.discard(*keys)
+        if not keys:
+            return
+        try:
+            await redis.delete(*(self.redis_key(key) for key in keys))
+            # every other process drops its L1 copy and running loads as well
+            await redis.publish(
+                INVALIDATION_CHANNEL, json.dumps([_origin, self.namespace, keys])
+            )
+        except Exception:
+            logging.exception(f"Error invalidating {self.namespace} cache")
+
+    async def _fill(
+        self,
+        key: str,
+        load: Callable[[], Awaitable],
+        remember_failure: bool,
+        ttl: float = None,
+    ) -> Any:
+        generations = self.generations([key])
+        try:
+            value = await load()
+        except Exception as e:
+            if remember_failure:
+                await self.set(
+                    key, str(e) or repr(e), failed=True, generations=generations
+                )
+            else:
+                # keep serving the stale value until it expires
+                logging.exception(f"Error refreshing {self.namespace} cache")
+            raise
+        await self.set(key, value, ttl=ttl, generations=generations)
+        return value
+
+    def _release(self, key: str, task: asyncio.Task) -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        # a background refresh nobody awaits must not log "never retrieved"
+        if not task.cancelled():
+            task.exception()
+
+    def _start(
+        self,
+        key: str,
+        load: Callable[[], Awaitable],
+        remember_failure: bool,
+        ttl: float = None,
+    ) -> asyncio.Task:
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.create_task(self._fill(key, load, remember_failure, ttl))
+            self._inflight[key] = task
+            task.add_done_callback(lambda task: self._release(key, task))
+        return task
+
+    async def load(
+        self, key: str, load: Callable[[], Awaitable], ttl: float = None
+    ) -> Any:
+        entry = await self.get(key)
+        if entry is not None:
+            if not entry.failed and entry.fresh_until <= time.time():
+                self._start(key, load, remember_failure=False)
+            return entry.result()
+
+        # one caller giving up must not cancel the load for everyone else
+        return await asyncio.shield(
+            self._start(key, load, remember_failure=True, ttl=ttl)
+        )
+
+
+def cached(namespace: str, key: Callable[..., str] = None):
+    cache = TieredCache(namespace, **cache_settings[namespace])
+
+    def make_key(*args) -> str:
+        return ":".join(str(arg) for arg in args)
+
+    key = key or make_key
+
+    def decorator(func: Callable[..., Awaitable]):
+        @functools.wraps(func)
+        async def wrapper(*args):
+            return await cache.load(key(*args), lambda: func(*args))
+
+        async def invalidate(*args) -> None:
+            await cache.invalidate(key(*args))
+
+        async def refresh(*args, ttl: float = None):
+            await cache.invalidate(key(*args))
+            return await cache.load(key(*args), lambda: func(*args), ttl)
+
+        wrapper.cache = cache
+        wrapper.cache_key = key
+        wrapper.invalidate = invalidate
+        wrapper.refresh = refresh
+        return wrapper
+
+    return decorator
+
+
+async def run_cache_invalidation_listener() -> None:
+    while True:
+        try:
+            async with redis.pubsub(ignore_subscribe_messages=True) as pubsub:
+                await pubsub.subscribe(INVALIDATION_CHANNEL)
+                async for message in pubsub.listen():
+                    origin, namespace, keys = json.loads(message["data"])
+                    if origin != _origin and namespace in _caches:
+                        _caches[namespace].discard(*keys)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logging.exception("Error listening for cache invalidations")
+        # L1 may have missed invalidations while disconnected
+        for cache in _caches.values():
+            cache._local.clear()
+        await asyncio.sleep(1)
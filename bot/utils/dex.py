@@ -1,48 +1,17 @@
-import base64
-import hashlib
-import hmac
 import logging
-from datetime import datetime, timezone
-from urllib.parse import urlencode
 
-import aiohttp
-from cryptography.fernet import Fernet
+from eth_account.signers.local import LocalAccount
 from web3 import AsyncWeb3
 
-from bot.config import allowance_abi, api_base_url, gas_ratio
-from bot.env import (
-    FERNET_KEY,
-    OKX_API_KEY,
-    OKX_PASSPHRASE,
-    OKX_PROJECT_ID,
-    OKX_SECRET_KEY,
-)
-
-
-async def get_transaction_count(
-    user_address: str, block_type: str, rpc_url: str, web3: AsyncWeb3
-):
-    payload = {
-        "jsonrpc": "2.0",
-        "method": "eth_getTransactionCount",
-        "params": [user_address, block_type],
-        "id": 1,
-    }
-    try:
-        async with aiohttp.ClientSession() as session:
-            async with session.post(
-                rpc_url, json=payload, headers={"Content-Type": "application/json"}
-            ) as response:
-                if response.status == 200:
-                    result = await response.json()
-                    return int(result["result"], 16) if "result" in result else None
-    except Exception:
-        return await web3.eth.get_transaction_count(user_address, block_type)
+from bot.config import allowance_abi, gas_ratio
+from bot.utils.nonce import reserved_nonce
+from bot.utils.okx import okx
+from bot.utils.signer import fernet, sign_transaction
 
 
 def decrypt_key(key: str):
     try:
-        return Fernet(FERNET_KEY).decrypt(key).hex()
+        return fernet.decrypt(key).hex()
     except Exception:
         logging.exception("Error decrypting key")
         raise
@@ -50,58 +19,12 @@ def decrypt_key(key: str):
 
 def decrypt_mnemonic(mnemonic: str):
     try:
-        return Fernet(FERNET_KEY).decrypt(mnemonic).decode()
+        return fernet.decrypt(mnemonic).decode()
     except Exception:
         logging.exception("Error decrypting mnemonic")
         raise
 
 
-def get_aggregator_request_url(method_name: str, query_params: dict):
-    try:
-        return f"{api_base_url}/aggregator{method_name}?{urlencode(query_params)}"
-    except Exception:
-        logging.exception("Error constructing aggregator request URL")
-        raise
-
-
-def get_crosschain_request_url(method_name: str, query_params: dict):
-    try:
-        return f"{api_base_url}/cross-chain{method_name}?{urlencode(query_params)}"
-    except Exception:
-        logging.exception("Error constructing crosschain request URL")
-        raise
-
-
-def get_headers_params(
-    request_method: str,
-    base_path: str,
-    method_name: str,
-    query_params: dict = None,
-    body: dict = None,
-):
-    try:
-        date = datetime.now(timezone.utc).isoformat()[:-9] + "Z"
-        query_string = f"?{urlencode(query_params)}" if query_params else ""
-        body = "" if body is None else body
-        url = f"/api/v5/dex/{base_path}{method_name}{query_string}"
-        message = f"{date}{request_method}{url}{body}"
-        sign = base64.b64encode(
-            hmac.new(OKX_SECRET_KEY.encode(), message.encode(), hashlib.sha256).digest()
-        ).decode()
-
-        return {
-            "Content-Type": "application/json",
-            "OK-ACCESS-PROJECT": OKX_PROJECT_ID,
-            "OK-ACCESS-KEY": OKX_API_KEY,
-            "OK-ACCESS-SIGN": sign,
-            "OK-ACCESS-TIMESTAMP": date,
-            "OK-ACCESS-PASSPHRASE": OKX_PASSPHRASE,
-        }
-    except Exception:
-        logging.exception("Error constructing headers parameters")
-        raise
-
-
 async def get_allowance(
     web3: AsyncWeb3, owner_address: str, spender_address: str, token_address: str
 ):
@@ -119,74 +42,67 @@ async def get_allowance(
         raise
 
 
-async def approve_transaction(session, chain_id: int, from_token: str, amount: str):
+async def broadcast(web3: AsyncWeb3, signed_tx) -> bytes:
     try:
-        headers = get_headers_params(
-            "GET",
-            "aggregator",
-            "/approve-transaction",
-            {
-                "chainId": str(chain_id),
-                "tokenContractAddress": from_token,
-                "approveAmount": amount,
-            },
-        )
-        url = get_aggregator_request_url(
-            "/approve-transaction",
+        return await web3.eth.send_raw_transaction(signed_tx.raw_transaction)
+    except Exception as e:
+        # the node already has this exact tx, so it was sent after all
+        if "already known" in str(e).lower():
+            return signed_tx.hash
+        raise
+
+
+async def approve_transaction(chain_id: int, from_token: str, amount: str):
+    try:
+        response = await okx.get(
+            "/aggregator/approve-transaction",
             {
                 "chainId": str(chain_id),
                 "tokenContractAddress": from_token,
                 "approveAmount": amount,
             },
         )
-
-        async with session.get(url, headers=headers) as response:
-            return await response.json()
+        return response.raise_for_error().first
     except Exception:
         logging.exception("Error approving transaction")
         raise
 
 
 async def send_approve_tx(
-    session,
     web3: AsyncWeb3,
     user: str,
     spender_address: str,
     from_token: str,
     from_amount: str,
-    private_key: str,
-    rpc_url: str,
+    account: LocalAccount,
     chain_id,
+    wait_for_receipt: bool = True,
 ):
     try:
         allowance_amount = await get_allowance(web3, user, spender_address, from_token)
-        nonce = await get_transaction_count(user, "pending", rpc_url, web3)
-        data = await approve_transaction(
-            session, str(chain_id), from_token, from_amount
-        )
+        if int(allowance_amount) >= int(from_amount):
+            return {"ok": False}
 
-        if nonce is None:
-            raise LookupError("Nonce not found")
-
-        if int(allowance_amount) < int(from_amount):
+        data = await approve_transaction(str(chain_id), from_token, from_amount)
+        async with reserved_nonce(web3, chain_id, user) as nonce:
             tx_object = {
                 "nonce": nonce,
                 "to": from_token,
-                "gas": int(int(data["data"][0]["gasLimit"]) * 2),
-                "gasPrice": int(int(data["data"][0]["gasPrice"]) * gas_ratio),
-                "data": data["data"][0]["data"],
+                "gas": int(int(data["gasLimit"]) * 2),
+                "gasPrice": int(int(data["gasPrice"]) * gas_ratio),
+                "data": data["data"],
                 "value": 0,
                 "chainId": chain_id,
             }
-            signed_tx = web3.eth.account.sign_transaction(tx_object, private_key)
-            tx = await web3.eth.send_raw_transaction(signed_tx.raw_transaction)
+            signed_tx = await sign_transaction(account, tx_object)
+            tx = await broadcast(web3, signed_tx)
+
+        if wait_for_receipt:
             try:
                 await web3.eth.wait_for_transaction_receipt(tx, 60)
             except Exception:
                 logging.exception("Error waiting for transaction receipt")
-            return {"ok": True, "nonce": nonce}
-        else:
-            return {"ok": False, "nonce": nonce}
+        return {"ok": True, "nonce": nonce}
     except Exception:
         logging.exception("Error sending approve transaction")
         raise
@@ -0,0 +1,36 @@
+from typing import Optional
+
+import aiohttp
+
+from bot.config import (
+    http_dns_cache_ttl,
+    http_keepalive_timeout,
+    http_pool_limit,
+    http_pool_limit_per_host,
+    http_timeout,
+)
+
+_session: Optional[aiohttp.ClientSession] = None
+
+
+def get_session() -> aiohttp.ClientSession:
+    global _session
+    if _session is None or _session.closed:
+        connector = aiohttp.TCPConnector(
+            limit=http_pool_limit,
+            limit_per_host=http_pool_limit_per_host,
+            keepalive_timeout=http_keepalive_timeout,
+            ttl_dns_cache=http_dns_cache_ttl,
+        )
+        _session = aiohttp.ClientSession(
+            connector=connector,
+            timeout=aiohttp.ClientTimeout(total=http_timeout),
+        )
+    return _session
+
+
+async def close_session() -> None:
+    global _session
+    if _session is not None and not _session.closed:
+        await _session.close()
+    _session = None
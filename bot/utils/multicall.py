@@ -0,0 +1,62 @@
+import asyncio
+import logging
+from typing import Any, Optional
+
+from eth_abi import decode, encode
+from eth_utils import function_signature_to_4byte_selector, to_checksum_address
+
+from bot.config import multicall3_abi, multicall3_address, multicall_chunk_size
+from bot.utils.providers import get_web3
+
+# (contract, function signature, args, output types),
+# e.g. (token, "balanceOf(address)", [wallet], ["uint256"])
+Call = tuple[str, str, list, list]
+
+
+def encode_call(signature: str, args: list) -> bytes:
+    arg_types = signature[signature.index("(") + 1 : -1]
+    selector = function_signature_to_4byte_selector(signature)
+    if not arg_types:
+        return selector
+    return selector + encode(arg_types.split(","), args)
+
+
+def decode_result(output_types: list, success: bool, data: bytes) -> Optional[Any]:
+    if not success or not data:
+        return None
+    try:
+        values = decode(output_types, data)
+    except Exception:
+        return None
+    return values[0] if len(values) == 1 else values
+
+
+async def _aggregate(chain_id: int, calls: list[Call]) -> list:
+    web3 = get_web3(chain_id)
+    contract = web3.eth.contract(address=multicall3_address, abi=multicall3_abi)
+    results = await contract.functions.aggregate3(
+        [
+            (to_checksum_address(target), True, encode_call(signature, args))
+            for target, signature, args, _ in calls
+        ]
+    ).call()
+    return [
+        decode_result(output_types, success, data)
+        for (_, _, _, output_types), (success, data) in zip(calls, results)
+    ]
+
+
+async def multicall(chain_id: int, calls: list[Call]) -> list:
+    if not calls:
+        return []
+    try:
+        chunks = await asyncio.gather(
+            *(
+                _aggregate(chain_id, calls[i : i + multicall_chunk_size])
+                for i in range(0, len(calls), multicall_chunk_size)
+            )
+        )
+        return [result for chunk in chunks for result in chunk]
+    except Exception:
+        logging.exception(f"Multicall of {len(calls)} calls failed on chain {chain_id}")
+        raise
@@ -0,0 +1,148 @@
+import logging
+import time
+from contextlib import asynccontextmanager
+
+from redis.asyncio import Redis
+from web3 import AsyncWeb3
+
+from bot.config import nonce_resync_interval, nonce_ttl
+from bot.env import REDIS_URL
+
+redis = Redis.from_url(REDIS_URL, decode_responses=True)
+
+# KEYS: next nonce, released nonces, in-flight nonces, synced marker
+# ARGV: ttl, now
+_reserve = redis.register_script("""
+if redis.call('EXISTS', KEYS[4]) == 0 then
+    return -1
+end
+local nonce = redis.call('ZRANGE', KEYS[2], 0, 0)[1]
+if nonce then
+    redis.call('ZREM', KEYS[2], nonce)
+    redis.call('EXPIRE', KEYS[1], ARGV[1])
+else
+    nonce = redis.call('GET', KEYS[1])
+    if not nonce then
+        return -1
+    end
+    redis.call('SET', KEYS[1], nonce + 1, 'EX', ARGV[1])
+end
+redis.call('ZADD', KEYS[3], ARGV[2] + ARGV[1], nonce)
+redis.call('EXPIRE', KEYS[3], ARGV[1])
+return tonumber(nonce)
+""")
+
+# KEYS: next nonce, released nonces, in-flight nonces, synced marker,
+# recently sent nonces
+# ARGV: on-chain pending count, ttl, now, resync interval
+_sync = redis.register_script("""
+local nonce = tonumber(redis.call('GET', KEYS[1]) or '-1')
+local chain_nonce = tonumber(ARGV[1])
+redis.call('ZREMRANGEBYSCORE', KEYS[3], '-inf', ARGV[3])
+redis.call('ZREMRANGEBYSCORE', KEYS[5], '-inf', ARGV[3])
+-- the endpoint that answered may not have seen a tx broadcast through
+-- another one yet, so the counter never drops to or below a recent send
+local floor = chain_nonce
+for _, sent in ipairs(redis.call('ZRANGE', KEYS[5], 0, -1)) do
+    floor = math.max(floor, tonumber(sent) + 1)
+end
+-- with nothing between reservation and broadcast every handed out nonce is
+-- in the chain's pending count, so a counter ahead of it points past a tx
+-- that was dropped or never sent and would leave later txs stuck on a gap
+if nonce < floor or redis.call('ZCARD', KEYS[3]) == 0 then
+    nonce = floor
+end
+redis.call('ZREMRANGEBYSCORE', KEYS[2], '-inf', '(' .. chain_nonce)
+redis.call('ZREMRANGEBYSCORE', KEYS[2], nonce, '+inf')
+redis.call('SET', KEYS[1], nonce + 1, 'EX', ARGV[2])
+redis.call('SET', KEYS[4], 1, 'EX', ARGV[4])
+redis.call('ZADD', KEYS[3], ARGV[3] + ARGV[2], nonce)
+redis.call('EXPIRE', KEYS[3], ARGV[2])
+return nonce
+""")
+
+# KEYS: in-flight nonces, recently sent nonces
+# ARGV: nonce, now, resync interval
+_sent = redis.register_script("""
+redis.call('ZREM', KEYS[1], ARGV[1])
+redis.call('ZADD', KEYS[2], ARGV[2] + ARGV[3], ARGV[1])
+redis.call('EXPIRE', KEYS[2], ARGV[3])
+""")
+
+# KEYS: next nonce, released nonces, in-flight nonces; ARGV: nonce, ttl
+_release = redis.register_script("""
+redis.call('ZREM', KEYS[3], ARGV[1])
+local next_nonce = tonumber(redis.call('GET', KEYS[1]) or '-1')
+local nonce = tonumber(ARGV[1])
+if next_nonce == nonce + 1 then
+    redis.call('SET', KEYS[1], nonce, 'EX', ARGV[2])
+elseif next_nonce > nonce + 1 then
+    redis.call('ZADD', KEYS[2], nonce, nonce)
+    redis.call('EXPIRE', KEYS[2], ARGV[2])
+end
+return next_nonce
+""")
+
+
+def _keys(chain_id: int, address: str) -> list:
+    key = f"nonce:{chain_id}:{address.lower()}"
+    return [
+        key,
+        f"{key}:released",
+        f"{key}:inflight",
+        f"{key}:synced",
+        f"{key}:sent",
+    ]
+
+
+async def reserve_nonce(web3: AsyncWeb3, chain_id: int, address: str) -> int:
+    keys = _keys(chain_id, address)
+    nonce = await _reserve(keys=keys[:4], args=[nonce_ttl, time.time()])
+    if nonce >= 0:
+        return nonce
+
+    # first use, or the last check against the chain is older than
+    # nonce_resync_interval
+    chain_nonce = await web3.eth.get_transaction_count(address, "pending")
+    return await _sync(
+        keys=keys, args=[chain_nonce, nonce_ttl, time.time(), nonce_resync_interval]
+    )
+
+
+async def sent_nonce(chain_id: int, address: str, nonce: int) -> None:
+    keys = _keys(chain_id, address)
+    # stays a lower bound for resyncs until every endpoint has seen the tx
+    await _sent(
+        keys=[keys[2], keys[4]], args=[nonce, time.time(), nonce_resync_interval]
+    )
+
+
+async def release_nonce(chain_id: int, address: str, nonce: int) -> None:
+    await _release(keys=_keys(chain_id, address)[:3], args=[nonce, nonce_ttl])
+
+
+async def reset_nonce(chain_id: int, address: str) -> None:
+    # recently sent nonces are kept so the resync cannot hand them out again
+    await redis.delete(*_keys(chain_id, address)[:4])
+
+
+def is_nonce_error(error: Exception) -> bool:
+    message = str(error).lower()
+    return "nonce" in message or "already known" in message
+
+
+@asynccontextmanager
+async def reserved_nonce(web3: AsyncWeb3, chain_id: int, address: str):
+    nonce = await reserve_nonce(web3, chain_id, address)
+    try:
+        yield nonce
+        await sent_nonce(chain_id, address, nonce)
+    except Exception as e:
+        try:
+            if is_nonce_error(e):
+                await reset_nonce(chain_id, address)
+            else:
+                await release_nonce(chain_id, address, nonce)
+        except Exception:
+            logging.exception(f"Error releasing nonce {nonce} for {address}")
+        raise
@@ -0,0 +1,165 @@
+import asyncio
+import base64
+import hashlib
+import hmac
+import json
+import logging
+import random
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Optional
+from urllib.parse import urlencode, urlsplit
+
+import aiohttp
+
+from bot.config import (
+    api_base_url,
+    okx_burst,
+    okx_max_retries,
+    okx_requests_per_second,
+    okx_retry_backoff,
+)
+from bot.env import OKX_API_KEY, OKX_PASSPHRASE, OKX_PROJECT_ID, OKX_SECRET_KEY
+from bot.utils.http import get_session
+
+
+class OkxApiError(Exception):
+    pass
+
+
+@dataclass
+class OkxResponse:
+    status: int
+    code: str
+    msg: str = ""
+    data: list = field(default_factory=list)
+
+    @property
+    def ok(self) -> bool:
+        return self.status == 200 and self.code == "0"
+
+    @property
+    def first(self) -> Optional[dict]:
+        return self.data[0] if self.data else None
+
+    def raise_for_error(self) -> "OkxResponse":
+        if not self.ok:
+            raise OkxApiError(f"OKX error {self.status}/{self.code}: {self.msg}")
+        return self
+
+
+class TokenBucket:
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(
+                    self.capacity, self.tokens + (now - self.updated) * self.rate
+                )
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+class OkxDexClient:
+    def __init__(
+        self,
+        base_url: str,
+        api_key: str,
+        secret_key: str,
+        passphrase: str,
+        project_id: str,
+        requests_per_second: float,
+        burst: float,
+        max_retries: int,
+        retry_backoff: float,
+    ):
+        self.base_url = base_url.rstrip("/")
+        self.base_path = urlsplit(self.base_url).path
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+        self._headers = {
+            "Content-Type": "application/json",
+            "OK-ACCESS-PROJECT": project_id,
+            "OK-ACCESS-KEY": api_key,
+            "OK-ACCESS-PASSPHRASE": passphrase,
+        }
+        self._hmac = hmac.new((secret_key or "").encode(), digestmod=hashlib.sha256)
+        self._bucket = TokenBucket(requests_per_second, burst)
+
+    def _sign_headers(self, method: str, request_path: str, body: str) -> dict:
+        timestamp = datetime.now(timezone.utc).isoformat()[:-9] + "Z"
+        mac = self._hmac.copy()
+        mac.update(f"{timestamp}{method}{request_path}{body}".encode())
+        return {
+            **self._headers,
+            "OK-ACCESS-SIGN": base64.b64encode(mac.digest()).decode(),
+            "OK-ACCESS-TIMESTAMP": timestamp,
+        }
+
+    async def _retry_delay(self, attempt: int) -> None:
+        delay = self.retry_backoff * 2**attempt
+        await asyncio.sleep(delay + random.uniform(0, delay))
+
+    async def request(
+        self, method: str, path: str, params: dict = None, body: Any = None
+    ) -> OkxResponse:
+        query = f"?{urlencode(params)}" if params else ""
+        request_path = f"{self.base_path}{path}{query}"
+        url = f"{self.base_url}{path}{query}"
+        payload = "" if body is None else json.dumps(body)
+
+        for attempt in range(self.max_retries + 1):
+            await self._bucket.acquire()
+            headers = self._sign_headers(method, request_path, payload)
+            try:
+                async with get_session().request(
+                    method, url, headers=headers, data=payload or None
+                ) as response:
+                    if response.status == 429 or response.status >= 500:
+                        error = f"HTTP {response.status}: {await response.text()}"
+                    else:
+                        data = await response.json(content_type=None)
+                        return OkxResponse(
+                            status=response.status,
+                            code=str(data.get("code")),
+                            msg=data.get("msg", ""),
+                            data=data.get("data") or [],
+                        )
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                error = repr(e)
+
+            if attempt < self.max_retries:
+                logging.warning(f"OKX {method} {path} failed ({error}), retrying")
+                await self._retry_delay(attempt)
+
+        raise OkxApiError(f"OKX {method} {path} failed: {error}")
+
+    async def get(self, path: str, params: dict = None) -> OkxResponse:
+        return await self.request("GET", path, params=params)
+
+    async def post(self, path: str, body: Any) -> OkxResponse:
+        return await self.request("POST", path, body=body)
+
+
+okx = OkxDexClient(
+    api_base_url,
+    OKX_API_KEY,
+    OKX_SECRET_KEY,
+    OKX_PASSPHRASE,
+    OKX_PROJECT_ID,
+    requests_per_second=okx_requests_per_second,
+    burst=okx_burst,
+    max_retries=okx_max_retries,
+    retry_backoff=okx_retry_backoff,
+)
@@ -0,0 +1,134 @@
+import asyncio
+import logging
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Optional
+
+from aiogram import html
+
+from bot.config import (
+    chain_id_to_name,
+    chain_id_to_native_token_name,
+    evm_native_coin,
+    portfolio_concurrency,
+    portfolio_timeout,
+    portfolio_tokens_per_chain,
+)
+from bot.utils.balances import (
+    fetch_ton_balance,
+    get_balances,
+    load_erc20_balances,
+    load_jetton_balances,
+)
+
+_semaphores: dict[str, asyncio.Semaphore] = {}
+
+
+@dataclass
+class ChainPortfolio:
+    name: str
+    native_symbol: str
+    native_decimals: int
+    # None means the provider failed or timed out
+    native_balance: Optional[int] = None
+    tokens: Optional[list] = None
+
+    @property
+    def complete(self) -> bool:
+        return self.native_balance is not None and self.tokens is not None
+
+
+@dataclass
+class Portfolio:
+    chains: list[ChainPortfolio] = field(default_factory=list)
+
+    @property
+    def complete(self) -> bool:
+        return all(chain.complete for chain in self.chains)
+
+
+def _semaphore(provider: str) -> asyncio.Semaphore:
+    if provider not in _semaphores:
+        kind = provider.split(":")[0]
+        _semaphores[provider] = asyncio.Semaphore(portfolio_concurrency[kind])
+    return _semaphores[provider]
+
+
+async def _limited(provider: str, fetch: Callable[..., Awaitable], *args) -> Any:
+    async with _semaphore(provider):
+        return await fetch(*args)
+
+
+async def _fetch(provider: str, fetch: Callable[..., Awaitable], *args) -> Any:
+    try:
+        return await asyncio.wait_for(
+            _limited(provider, fetch, *args), portfolio_timeout
+        )
+    except asyncio.TimeoutError:
+        logging.warning(f"Portfolio fetch from {provider} timed out")
+    except Exception:
+        logging.exception(f"Portfolio fetch from {provider} failed")
+    return None
+
+
+async def _evm_native_balance(chain_id: int, wallet_address: str) -> int:
+    balances = await get_balances(chain_id, wallet_address, [evm_native_coin])
+    return balances[evm_native_coin]
+
+
+async def _token_list(fetch: Callable[..., Awaitable], *args) -> list:
+    tokens, _ = await fetch(*args)
+    return tokens
+
+
+async def get_portfolio(evm_address: str, ton_address: str) -> Portfolio:
+    portfolio = Portfolio()
+    requests = []
+    for chain_id, name in chain_id_to_name.items():
+        portfolio.chains.append(
+            ChainPortfolio(name, chain_id_to_native_token_name[chain_id], 18)
+        )
+        requests += [
+            _fetch(f"rpc:{chain_id}", _evm_native_balance, chain_id, evm_address),
+            _fetch("moralis", _token_list, load_erc20_balances, evm_address, chain_id),
+        ]
+    portfolio.chains.append(ChainPortfolio("ton", "TON", 9))
+    requests += [
+        _fetch("toncenter", fetch_ton_balance, ton_address),
+        _fetch("toncenter", _token_list, load_jetton_balances, ton_address),
+    ]
+
+    results = await asyncio.gather(*requests)
+    for chain, native_balance, tokens in zip(
+        portfolio.chains, results[::2], results[1::2]
+    ):
+        chain.native_balance = native_balance
+        chain.tokens = tokens
+    return portfolio
+
+
+def format_amount(amount: int, decimals: int) -> str:
+    return f"{amount / 10**decimals:.6f}".rstrip("0").rstrip(".")
+
+
+def format_portfolio(portfolio: Portfolio) -> str:
+    sections = []
+    for chain in portfolio.chains:
+        native = (
+            "unavailable"
+            if chain.native_balance is None
+            else format_amount(chain.native_balance, chain.native_decimals)
+        )
+        lines = [f"{html.bold(chain.name.upper())}", f"{chain.native_symbol}: {native}"]
+        if chain.tokens is None:
+            lines.append("Tokens: unavailable")
+        tokens = chain.tokens or []
+        for token in tokens[:portfolio_tokens_per_chain]:
+            lines.append(
+                f"{html.quote(token['name'])}: {format_amount(token['balance'], token['decimals'])}"
+            )
+        if len(tokens) > portfolio_tokens_per_chain:
+            lines.append(f"...and {len(tokens) - portfolio_tokens_per_chain} more")
+        sections.append("\n".join(lines))
+    if not portfolio.complete:
+        sections.append("Some balances could not be loaded, try again later.")
+    return "\n\n".join(sections)
@@ -0,0 +1,69 @@
+import asyncio
+import logging
+import time
+
+from web3 import AsyncWeb3
+
+from bot.config import chain_id_to_rpc_urls, rpc_health_interval, rpc_health_timeout
+from bot.utils.rpc_router import RoutedHTTPProvider
+
+_providers: dict[int, AsyncWeb3] = {}
+_health: dict[int, dict] = {}
+
+
+def _create_web3(chain_id: int) -> AsyncWeb3:
+    rpc_urls = chain_id_to_rpc_urls.get(chain_id)
+    if not rpc_urls:
+        raise ValueError(f"Unsupported chain ID: {chain_id}")
+    web3 = AsyncWeb3(RoutedHTTPProvider(chain_id, rpc_urls))
+    _providers[chain_id] = web3
+    return web3
+
+
+def get_web3(chain_id: int) -> AsyncWeb3:
+    web3 = _providers.get(chain_id) or _create_web3(chain_id)
+    if not web3.provider.healthy:
+        raise ConnectionError(f"RPC for chain {chain_id} is unhealthy")
+    return web3
+
+
+def get_health() -> dict[int, dict]:
+    return dict(_health)
+
+
+async def init_providers() -> None:
+    for chain_id in chain_id_to_rpc_urls:
+        if chain_id not in _providers:
+            _create_web3(chain_id)
+
+
+async def check_provider(chain_id: int, web3: AsyncWeb3) -> None:
+    provider: RoutedHTTPProvider = web3.provider
+    await provider.probe(rpc_health_timeout)
+
+    was_ok = _health.get(chain_id, {}).get("ok", True)
+    _health[chain_id] = {
+        "ok": provider.healthy,
+        "endpoints": [
+            {
+                "url": endpoint.url,
+                "ok": endpoint.healthy,
+                "latency": endpoint.latency,
+                "errors": endpoint.errors,
+            }
+            for endpoint in provider.ranked()
+        ],
+        "checked_at": time.time(),
+    }
+    if was_ok and not provider.healthy:
+        logging.warning(f"All RPC endpoints for chain {chain_id} are unhealthy")
+    elif not was_ok and provider.healthy:
+        logging.info(f"RPC for chain {chain_id} recovered")
+
+
+async def monitor_providers() -> None:
+    while True:
+        await asyncio.gather(
+            *(check_provider(chain_id, web3) for chain_id, web3 in _providers.items())
+        )
+        await asyncio.sleep(rpc_health_interval)
@@ -0,0 +1,99 @@
+import asyncio
+from typing import Awaitable, Callable
+
+from cachetools import TTLCache
+
+from bot.config import quote_amount_precision, quote_cache_size, quote_ttl
+from bot.utils.okx import OkxResponse, okx
+
+_quotes = TTLCache(maxsize=quote_cache_size, ttl=quote_ttl)
+_inflight: dict[tuple, asyncio.Task] = {}
+
+
+def amount_bucket(amount) -> int:
+    amount = int(amount)
+    digits = len(str(amount))
+    if digits <= quote_amount_precision:
+        return amount
+    scale = 10 ** (digits - quote_amount_precision)
+    return (amount + scale // 2) // scale * scale
+
+
+async def _single_flight(
+    key: tuple, fetch: Callable[[], Awaitable[OkxResponse]]
+) -> OkxResponse:
+    if (cached := _quotes.get(key)) is not None:
+        return cached
+
+    task = _inflight.get(key)
+    if task is None:
+
+        async def run() -> OkxResponse:
+            try:
+                response = await fetch()
+                if response.ok:
+                    _quotes[key] = response
+                return response
+            finally:
+                _inflight.pop(key, None)
+
+        task = _inflight[key] = asyncio.create_task(run())
+
+    # one caller giving up must not cancel the request for everyone else
+    return await asyncio.shield(task)
+
+
+async def get_swap_quote(
+    chain_id: int, from_token: str, to_token: str, amount
+) -> OkxResponse:
+    bucket = amount_bucket(amount)
+    key = ("swap", chain_id, from_token.lower(), to_token.lower(), bucket)
+    return await _single_flight(
+        key,
+        lambda: okx.get(
+            "/aggregator/quote",
+            {
+                "chainId": str(chain_id),
+                "amount": str(bucket),
+                "fromTokenAddress": from_token,
+                "toTokenAddress": to_token,
+            },
+        ),
+    )
+
+
+async def get_crosschain_quote(
+    from_chain_id: int,
+    to_chain_id: int,
+    from_token: str,
+    to_token: str,
+    amount,
+    slippage: float,
+    max_price_impact: float,
+) -> OkxResponse:
+    bucket = amount_bucket(amount)
+    key = (
+        "cross-chain",
+        from_chain_id,
+        to_chain_id,
+        from_token.lower(),
+        to_token.lower(),
+        bucket,
+        str(slippage),
+        str(max_price_impact),
+    )
+    return await _single_flight(
+        key,
+        lambda: okx.get(
+            "/cross-chain/quote",
+            {
+                "fromChainId": str(from_chain_id),
+                "toChainId": str(to_chain_id),
+                "fromTokenAddress": from_token,
+                "toTokenAddress": to_token,
+                "amount": str(bucket),
+                "slippage": str(slippage),
+                "priceImpactProtectionPercentage": max_price_impact,
+            },
+        ),
+    )
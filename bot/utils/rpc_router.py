@@ -0,0 +1,243 @@
+import asyncio
+import time
+from typing import Any, Optional
+
+import aiohttp
+from web3.providers.async_base import AsyncJSONBaseProvider
+from web3._utils.batching import sort_batch_response_by_response_ids
+from web3.types import RPCEndpoint, RPCRequest, RPCResponse
+
+from bot.config import (
+    rpc_batch_max_size,
+    rpc_batch_window,
+    rpc_hedge_delay,
+    rpc_hedge_fanout,
+    rpc_latency_ewma_alpha,
+    rpc_max_cooldown,
+    rpc_read_methods,
+    rpc_request_timeout,
+)
+from bot.utils.http import get_session
+
+
+class RPCEndpointState:
+    def __init__(self, url: str):
+        self.url = url
+        self.latency: Optional[float] = None
+        self.errors = 0
+        self.cooldown_until = 0.0
+
+    @property
+    def healthy(self) -> bool:
+        return time.monotonic() >= self.cooldown_until
+
+    def score(self) -> float:
+        latency = rpc_hedge_delay if self.latency is None else self.latency
+        return latency * (1 + self.errors)
+
+    def record_latency(self, elapsed: float) -> None:
+        if self.latency is None:
+            self.latency = elapsed
+        else:
+            self.latency += rpc_latency_ewma_alpha * (elapsed - self.latency)
+
+    def record_success(self, elapsed: float) -> None:
+        self.record_latency(elapsed)
+        self.errors = 0
+        self.cooldown_until = 0.0
+
+    def record_failure(self) -> None:
+        self.errors += 1
+        self.cooldown_until = time.monotonic() + min(2**self.errors, rpc_max_cooldown)
+
+
+class RPCBatchRejected(ConnectionError):
+    pass
+
+
+class RoutedHTTPProvider(AsyncJSONBaseProvider):
+    def __init__(self, chain_id: int, urls: list, **kwargs: Any):
+        if not urls:
+            raise ValueError(f"No RPC endpoints configured for chain {chain_id}")
+        self.chain_id = chain_id
+        self.endpoints = [RPCEndpointState(url) for url in urls]
+        self._batch: list[tuple[RPCRequest, asyncio.Future]] = []
+        self._batch_flush: Optional[asyncio.TimerHandle] = None
+        self._batch_tasks: set[asyncio.Task] = set()
+        super().__init__(**kwargs)
+
+    def __str__(self) -> str:
+        return f"Routed RPC connection for chain {self.chain_id}"
+
+    def ranked(self) -> list:
+        return sorted(self.endpoints, key=lambda e: (not e.healthy, e.score()))
+
+    @property
+    def healthy(self) -> bool:
+        return any(endpoint.healthy for endpoint in self.endpoints)
+
+    async def _post(
+        self, endpoint: RPCEndpointState, data: bytes, batch: bool = False
+    ) -> bytes:
+        started = time.monotonic()
+        try:
+            async with get_session().post(
+                endpoint.url,
+                data=data,
+                headers={"Content-Type": "application/json"},
+                timeout=aiohttp.ClientTimeout(total=rpc_request_timeout),
+            ) as response:
+                response.raise_for_status()
+                raw_response = await response.read()
+            # nodes without batch support answer with a single error object
+            if batch and not raw_response.lstrip().startswith(b"["):
+                raise RPCBatchRejected(
+                    f"RPC batch rejected by {endpoint.url}: {raw_response[:200]!r}"
+                )
+        except asyncio.CancelledError:
+            # a hedge beat this request, so its latency is at least this long
+            endpoint.record_latency(time.monotonic() - started)
+            raise
+        except Exception:
+            endpoint.record_failure()
+            raise
+        endpoint.record_success(time.monotonic() - started)
+        return raw_response
+
+    async def _send(self, data: bytes, hedged: bool, batch: bool = False) -> bytes:
+        # reads are hedged and fail over freely; writes such as
+        # eth_sendRawTransaction only move on when the connection could not
+        # be opened, since after a timeout the tx may already be in a mempool
+        # and re-broadcasting it fails with "already known" or a nonce error
+        candidates = iter(self.ranked())
+        hedges_left = rpc_hedge_fanout - 1 if hedged else 0
+        pending = {asyncio.create_task(self._post(next(candidates), data, batch))}
+        last_error = None
+        try:
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending,
+                    timeout=rpc_hedge_delay if hedges_left > 0 else None,
+                    return_when=asyncio.FIRST_COMPLETED,
+                )
+                for task in done:
+                    if task.exception() is None:
+                        return task.result()
+                    last_error = task.exception()
+                    if not hedged and not isinstance(
+                        last_error, aiohttp.ClientConnectorError
+                    ):
+                        raise last_error
+
+                if done and pending:
+                    continue
+                if not done:
+                    hedges_left -= 1
+                endpoint = next(candidates, None)
+                if endpoint is not None:
+                    pending.add(asyncio.create_task(self._post(endpoint, data, batch)))
+        finally:
+            for task in pending:
+                task.cancel()
+        raise ConnectionError(
+            f"All RPC endpoints failed for chain {self.chain_id}"
+        ) from last_error
+
+    def _flush_batch(self) -> None:
+        if self._batch_flush is not None:
+            self._batch_flush.cancel()
+            self._batch_flush = None
+        batch, self._batch = self._batch, []
+        if batch:
+            task = asyncio.create_task(self._send_batch(batch))
+            self._batch_tasks.add(task)
+            task.add_done_callback(self._batch_tasks.discard)
+
+    async def _send_one(self, request: RPCRequest) -> RPCResponse:
+        return self.decode_rpc_response(
+            await self._send(self.encode_rpc_dict(request), True)
+        )
+
+    async def _send_batch(self, batch: list) -> None:
+        try:
+            if len(batch) == 1:
+                request, _ = batch[0]
+                responses = [await self._send_one(request)]
+            else:
+                request_data = self.encode_batch_request_dicts([r for r, _ in batch])
+                try:
+                    responses = self.decode_rpc_response(
+                        await self._send(request_data, True, batch=True)
+                    )
+                except ConnectionError as e:
+                    if not isinstance(e.__cause__, RPCBatchRejected):
+                        raise
+                    # the last endpoint tried does not take batches either
+                    responses = await asyncio.gather(
+                        *(self._send_one(request) for request, _ in batch)
+                    )
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        by_id = {response.get("id"): response for response in responses}
+        for request, future in batch:
+            if future.done():
+                continue
+            response = by_id.get(request["id"])
+            if response is None:
+                future.set_exception(
+                    ConnectionError(f"No response for RPC request {request['id']}")
+                )
+            else:
+                future.set_result(response)
+
+    async def make_request(self, method: RPCEndpoint, params: Any) -> RPCResponse:
+        if method not in rpc_read_methods:
+            request_data = self.encode_rpc_request(method, params)
+            return self.decode_rpc_response(await self._send(request_data, False))
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._batch.append((self.form_request(method, params), future))
+        if len(self._batch) >= rpc_batch_max_size:
+            self._flush_batch()
+        elif self._batch_flush is None:
+            self._batch_flush = loop.call_later(rpc_batch_window, self._flush_batch)
+        return await future
+
+    async def make_batch_request(
+        self, requests: list[tuple[RPCEndpoint, Any]]
+    ) -> list[RPCResponse] | RPCResponse:
+        request_data = self.encode_batch_rpc_request(requests)
+        hedged = all(method in rpc_read_methods for method, _ in requests)
+        response = self.decode_rpc_response(
+            await self._send(request_data, hedged, batch=True)
+        )
+        if not isinstance(response, list):
+            return response
+        return sort_batch_response_by_response_ids(response)
+
+    async def _probe(
+        self, endpoint: RPCEndpointState, data: bytes, timeout: float
+    ) -> None:
+        try:
+            await asyncio.wait_for(self._post(endpoint, data), timeout)
+        except asyncio.TimeoutError:
+            # a hanging endpoint must go into cooldown, not just look slow
+            endpoint.record_failure()
+
+    async def probe(self, timeout: float) -> None:
+        request_data = self.encode_rpc_request(RPCEndpoint("eth_blockNumber"), [])
+        await asyncio.gather(
+            *(
+                self._probe(endpoint, request_data, timeout)
+                for endpoint in self.endpoints
+            ),
+            return_exceptions=True,
+        )
+
+    async def is_connected(self, show_traceback: bool = False) -> bool:
+        return self.healthy
@@ -0,0 +1,122 @@
+import asyncio
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Optional
+
+from cachetools import TTLCache
+from cryptography.fernet import Fernet
+from eth_account import Account
+from eth_account.datastructures import SignedMessage, SignedTransaction
+from eth_account.signers.local import LocalAccount
+from tonutils.wallet import WalletV4R2
+
+from bot.config import (
+    signer_cache_size,
+    signer_cache_ttl,
+    signing_executor,
+    signing_workers,
+)
+from bot.env import FERNET_KEY
+
+fernet = Fernet(FERNET_KEY)
+
+
+class _Signer:
+    __slots__ = ("secret", "signer")
+
+    def __init__(self, secret: bytes, signer: Any):
+        self.secret = bytearray(secret)
+        self.signer = signer
+
+    def wipe(self) -> None:
+        self.secret[:] = bytes(len(self.secret))
+        self.signer = None
+
+
+class _SignerCache(TTLCache):
+    def popitem(self):
+        key, entry = super().popitem()
+        entry.wipe()
+        return key, entry
+
+    def expire(self, time=None):
+        expired = super().expire(time)
+        for _, entry in expired:
+            entry.wipe()
+        return expired
+
+
+_signers = _SignerCache(maxsize=signer_cache_size, ttl=signer_cache_ttl)
+
+
+def get_evm_signer(user_id: int, encrypted_key: str) -> LocalAccount:
+    entry = _signers.get(("evm", user_id))
+    if entry is None:
+        private_key = fernet.decrypt(encrypted_key)
+        entry = _signers[("evm", user_id)] = _Signer(
+            private_key, Account.from_key(private_key)
+        )
+    return entry.signer
+
+
+def get_ton_keypair(user_id: int, encrypted_mnemonic: str) -> tuple[bytes, bytes]:
+    entry = _signers.get(("ton", user_id))
+    if entry is None:
+        mnemonic = fernet.decrypt(encrypted_mnemonic).decode().split()
+        _, public_key, private_key, _ = WalletV4R2.from_mnemonic(None, mnemonic)
+        entry = _signers[("ton", user_id)] = _Signer(private_key, public_key)
+    return entry.signer, bytes(entry.secret)
+
+
+_executor: Optional[Executor] = None
+
+
+def get_signing_executor() -> Executor:
+    global _executor
+    if _executor is None:
+        if signing_executor == "process":
+            _executor = ProcessPoolExecutor(max_workers=signing_workers)
+        else:
+            _executor = ThreadPoolExecutor(
+                max_workers=signing_workers, thread_name_prefix="signer"
+            )
+    return _executor
+
+
+def shutdown_signing_executor() -> None:
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+
+
+# Process workers get the raw key over the pool's private pipe and keep
+# nothing once the call returns.
+def _sign_transaction(private_key: bytes, tx: dict) -> SignedTransaction:
+    return Account.sign_transaction(tx, private_key)
+
+
+def _sign_typed_data(private_key: bytes, full_message: dict) -> SignedMessage:
+    return Account.sign_typed_data(private_key, full_message=full_message)
+
+
+async def sign_transaction(account: LocalAccount, tx: dict) -> SignedTransaction:
+    loop = asyncio.get_running_loop()
+    if signing_executor == "process":
+        return await loop.run_in_executor(
+            get_signing_executor(), _sign_transaction, account.key, tx
+        )
+    return await loop.run_in_executor(
+        get_signing_executor(), account.sign_transaction, tx
+    )
+
+
+async def sign_typed_data(account: LocalAccount, full_message: dict) -> SignedMessage:
+    loop = asyncio.get_running_loop()
+    if signing_executor == "process":
+        return await loop.run_in_executor(
+            get_signing_executor(), _sign_typed_data, account.key, full_message
+        )
+    return await loop.run_in_executor(
+        get_signing_executor(),
+        lambda: account.sign_typed_data(full_message=full_message),
+    )
@@ -1,19 +1,18 @@
 import logging
 
-import aiohttp
-from async_lru import alru_cache
 from pytoniq import Address
-from redis.asyncio import Redis
-from web3 import AsyncWeb3
 
-from bot.config import (
-    chain_id_to_native_token_name,
-    chain_id_to_rpc_url,
-    evm_native_coin,
-)
-from bot.env import REDIS_URL, TONCENTER_API_KEY
+from bot.config import chain_id_to_native_token_name, evm_native_coin
+from bot.env import TONCENTER_API_KEY
+from bot.utils.cache import cached
+from bot.utils.http import get_session
+from bot.utils.multicall import multicall
+from bot.utils.providers import get_web3
+from bot.utils.token_registry import TokenInfo, get_token, save_tokens
 
-redis = Redis.from_url(REDIS_URL, decode_responses=True)
+
+def token_key(chain_id: int, token_address: str) -> str:
+    return f"{chain_id}:{token_address.lower()}"
 
 
 def ton_address_validation(address: str) -> bool:
@@ -24,19 +23,16 @@ def ton_address_validation(address: str) -> bool:
         return False
 
 
-@alru_cache(maxsize=5000)
+@cached("decimals", key=token_key)
 async def get_evm_token_decimals(chain_id: int, token_address: str) -> int:
     try:
         if evm_native_coin.lower() == token_address.lower():
             return 18
 
-        cache_key = f"decimals:{chain_id}:{token_address.lower()}"
-        if (cached_decimals := await redis.get(cache_key)) is not None:
-            return int(cached_decimals)
+        if (token := get_token(chain_id, token_address)) is not None:
+            return token.decimals
 
-        web3 = AsyncWeb3(AsyncWeb3.AsyncHTTPProvider(chain_id_to_rpc_url.get(chain_id)))
-        if not await web3.is_connected():
-            raise ConnectionError("Failed to connect to RPC")
+        web3 = get_web3(chain_id)
 
         decimals_abi = [
             {
@@ -54,14 +50,14 @@ async def get_evm_token_decimals(chain_id: int, token_address: str) -> int:
         )
 
         decimals = await token_contract.functions.decimals().call()
-        await redis.set(cache_key, decimals, ex=864000)
+        await save_tokens(chain_id, {token_address: TokenInfo(decimals)})
         return decimals
     except Exception:
         logging.exception("Error getting token decimals")
         raise
 
 
-@alru_cache(maxsize=5000)
+@cached("token_name", key=token_key)
 async def get_token_name(chain_id: int, token_address: str) -> str:
     try:
         if evm_native_coin.lower() == token_address.lower():
@@ -70,13 +66,11 @@ async def get_token_name(chain_id: int, token_address: str) -> str:
             else:
                 raise ValueError(f"Unsupported chain ID: {chain_id}")
 
-        cache_key = f"name:{chain_id}:{token_address.lower()}"
-        if (cached_name := await redis.get(cache_key)) is not None:
-            return cached_name
+        token = get_token(chain_id, token_address)
+        if token is not None and token.name:
+            return token.name
 
-        web3 = AsyncWeb3(AsyncWeb3.AsyncHTTPProvider(chain_id_to_rpc_url.get(chain_id)))
-        if not await web3.is_connected():
-            raise ConnectionError("Failed to connect to RPC")
+        web3 = get_web3(chain_id)
 
         name_abi = [
             {
@@ -94,37 +88,114 @@ async def get_token_name(chain_id: int, token_address: str) -> str:
         )
 
         token_name = await token_contract.functions.name().call()
-        await redis.set(cache_key, token_name, ex=864000)
+        # the registry stores decimals alongside every name
+        decimals = (
+            token.decimals
+            if token is not None
+            else await get_evm_token_decimals(chain_id, token_address)
+        )
+        await save_tokens(
+            chain_id, {token_address: TokenInfo(decimals, name=token_name)}
+        )
         return token_name
     except Exception:
         logging.exception("Error getting token name")
         raise
 
 
-@alru_cache(maxsize=5000)
+async def get_token_metadata(chain_id: int, tokens: list) -> dict:
+    try:
+        metadata = {}
+        lookups = []
+        for token in tokens:
+            known = get_token(chain_id, token)
+            if evm_native_coin.lower() == token.lower():
+                metadata[token] = {
+                    "name": chain_id_to_native_token_name.get(chain_id),
+                    "decimals": 18,
+                }
+            elif known is not None and known.name:
+                metadata[token] = {"name": known.name, "decimals": known.decimals}
+            else:
+                lookups.append(token)
+        if not lookups:
+            return metadata
+
+        keys = {token: token_key(chain_id, token) for token in lookups}
+        cached_decimals = await get_evm_token_decimals.cache.get_many(
+            list(keys.values())
+        )
+        cached_names = await get_token_name.cache.get_many(list(keys.values()))
+
+        missing = []
+        for token, key in keys.items():
+            decimals, name = cached_decimals.get(key), cached_names.get(key)
+            if decimals is None or name is None or decimals.failed or name.failed:
+                missing.append(token)
+            else:
+                metadata[token] = {"name": name.value, "decimals": decimals.value}
+        if not missing:
+            return metadata
+
+        calls = []
+        for token in missing:
+            calls += [
+                (token, "decimals()", [], ["uint8"]),
+                (token, "name()", [], ["string"]),
+            ]
+        results = await multicall(chain_id, calls)
+        await save_tokens(
+            chain_id,
+            {
+                token: TokenInfo(decimals, name=name)
+                for token, decimals, name in zip(missing, results[::2], results[1::2])
+                if decimals is not None
+            },
+        )
+
+        for token, decimals, name in zip(missing, results[::2], results[1::2]):
+            metadata[token] = {"name": name, "decimals": decimals}
+        await get_evm_token_decimals.cache.set_many(
+            {
+                keys[token]: decimals
+                for token, decimals in zip(missing, results[::2])
+                if decimals is not None
+            }
+        )
+        await get_token_name.cache.set_many(
+            {
+                keys[token]: name
+                for token, name in zip(missing, results[1::2])
+                if name is not None
+            }
+        )
+        return metadata
+    except Exception:
+        logging.exception("Error getting token metadata")
+        raise
+
+
+@cached("jetton_decimals")
 async def get_jetton_decimals(jetton_address: str):
     try:
         url = f"https://toncenter.com/api/v3/jetton/masters?address={jetton_address}&api_key={TONCENTER_API_KEY}"
 
-        async with aiohttp.ClientSession() as session:
-            async with session.get(url) as response:
-                if response.status != 200:
-                    raise Exception(
-                        f"HTTP Error {response.status}: {await response.text()}"
-                    )
-
-                try:
-                    data = await response.json()
-                except Exception as e:
-                    raise Exception("Invalid JSON response") from e
-
-                jetton_masters = data.get("jetton_masters", [])
-                if not jetton_masters:
-                    raise Exception(
-                        f"No jetton data found for address {jetton_address}"
-                    )
-
-                return int(jetton_masters[0]["jetton_content"]["decimals"])
+        async with get_session().get(url) as response:
+            if response.status != 200:
+                raise Exception(
+                    f"HTTP Error {response.status}: {await response.text()}"
+                )
+
+            try:
+                data = await response.json()
+            except Exception as e:
+                raise Exception("Invalid JSON response") from e
+
+            jetton_masters = data.get("jetton_masters", [])
+            if not jetton_masters:
+                raise Exception(f"No jetton data found for address {jetton_address}")
+
+            return int(jetton_masters[0]["jetton_content"]["decimals"])
     except Exception:
         logging.exception("Error getting token name")
         raise
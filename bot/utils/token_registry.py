@@ -0,0 +1,132 @@
+import asyncio
+import logging
+from dataclasses import dataclass
+from typing import Optional
+
+from sqlalchemy import func, select
+from sqlalchemy.dialects.postgresql import insert
+
+from bot.config import chain_id_to_name, token_registry_refresh_interval
+from bot.db.database import async_session
+from bot.db.models import Token
+from bot.utils.okx import okx
+
+_registry: dict[tuple[int, str], "TokenInfo"] = {}
+
+
+@dataclass(frozen=True, slots=True)
+class TokenInfo:
+    decimals: int
+    symbol: Optional[str] = None
+    name: Optional[str] = None
+    logo: Optional[str] = None
+
+    def merge(self, known: Optional["TokenInfo"]) -> "TokenInfo":
+        if known is None:
+            return self
+        return TokenInfo(
+            decimals=self.decimals,
+            symbol=self.symbol or known.symbol,
+            name=self.name or known.name,
+            logo=self.logo or known.logo,
+        )
+
+
+def get_token(chain_id: int, address: str) -> Optional[TokenInfo]:
+    return _registry.get((chain_id, address.lower()))
+
+
+async def load_token_registry() -> int:
+    async with async_session() as session:
+        result = await session.execute(
+            select(
+                Token.chain_id,
+                Token.address,
+                Token.decimals,
+                Token.symbol,
+                Token.name,
+                Token.logo,
+            )
+        )
+        for chain_id, address, *info in result:
+            _registry[(chain_id, address)] = TokenInfo(*info)
+    return len(_registry)
+
+
+async def save_tokens(chain_id: int, tokens: dict) -> int:
+    try:
+        changed = {}
+        for address, info in tokens.items():
+            key = (chain_id, address.lower())
+            info = info.merge(_registry.get(key))
+            if info != _registry.get(key):
+                changed[key] = info
+        if not changed:
+            return 0
+
+        stmt = insert(Token)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[Token.chain_id, Token.address],
+            set_={
+                "decimals": stmt.excluded.decimals,
+                "symbol": func.coalesce(stmt.excluded.symbol, Token.symbol),
+                "name": func.coalesce(stmt.excluded.name, Token.name),
+                "logo": func.coalesce(stmt.excluded.logo, Token.logo),
+                "updated_at": func.now(),
+            },
+        )
+        async with async_session() as session:
+            await session.execute(
+                stmt,
+                [
+                    {
+                        "chain_id": chain_id,
+                        "address": address,
+                        "decimals": info.decimals,
+                        "symbol": info.symbol,
+                        "name": info.name,
+                        "logo": info.logo,
+                    }
+                    for (_, address), info in changed.items()
+                ],
+            )
+            await session.commit()
+        _registry.update(changed)
+        return len(changed)
+    except Exception:
+        logging.exception(f"Error saving token metadata for chain {chain_id}")
+        return 0
+
+
+async def fetch_okx_tokens(chain_id: int) -> dict:
+    response = (
+        await okx.get("/aggregator/all-tokens", {"chainId": chain_id})
+    ).raise_for_error()
+    tokens = {}
+    for token in response.data:
+        address = token.get("tokenContractAddress")
+        decimals = str(token.get("decimals", ""))
+        if not address or not decimals.isdigit():
+            continue
+        tokens[address] = TokenInfo(
+            decimals=int(decimals),
+            symbol=token.get("tokenSymbol") or None,
+            name=token.get("tokenName") or None,
+            logo=token.get("tokenLogoUrl") or None,
+        )
+    return tokens
+
+
+async def refresh_token_registry() -> None:
+    for chain_id in chain_id_to_name:
+        try:
+            saved = await save_tokens(chain_id, await fetch_okx_tokens(chain_id))
+            logging.info(f"Token registry: {saved} tokens updated on chain {chain_id}")
+        except Exception:
+            logging.exception(f"Error refreshing token registry for chain {chain_id}")
+
+
+async def run_token_registry_refresh() -> None:
+    while True:
+        await refresh_token_registry()
+        await asyncio.sleep(token_registry_refresh_interval)
@@ -1,15 +1,24 @@
+import asyncio
 import logging
+from concurrent.futures import ProcessPoolExecutor
 from secrets import token_bytes
+from typing import Optional
 
 from coincurve import PublicKey
 from cryptography.fernet import Fernet
-from pytoniq import LiteClient, WalletV4R2
+from pytoniq import WalletV4R2
+from pytoniq.contract.wallets.wallet import WALLET_V4_R2_CODE
+from pytoniq_core import Address, StateInit
+from pytoniq_core.crypto.keys import mnemonic_new, mnemonic_to_private_key
 from Crypto.Hash import keccak
 
+from bot.config import wallet_generation_workers
 from bot.env import FERNET_KEY
 
 fernet = Fernet(FERNET_KEY)
 
+_executor: Optional[ProcessPoolExecutor] = None
+
 
 def evm_generator():
     private_key = keccak.new(digest_bits=256, data=token_bytes(32)).digest()
@@ -20,15 +29,43 @@ def evm_generator():
 
 
 
-async def ton_generator():
-    client = LiteClient.from_mainnet_config(ls_i=2, trust_level=2, timeout=15)
-    await client.connect()
-    wallet = await WalletV4R2.create(provider=client, wc=0)
-
-    mnemonic = " ".join(wallet[0])
-    encrypted_mnemonic = fernet.encrypt(mnemonic.encode()).decode()
+# The v4r2 address is the hash of the wallet's state init, so it is derived
+# locally; mnemonic generation is the CPU-heavy part and runs in worker processes.
+def ton_wallet():
+    mnemonic = mnemonic_new(24)
+    public_key, _ = mnemonic_to_private_key(mnemonic)
+    state_init = StateInit(
+        code=WALLET_V4_R2_CODE, data=WalletV4R2.create_data_cell(public_key)
+    )
+    address = Address((0, state_init.serialize().hash))
 
-    await client.close()
-    return encrypted_mnemonic, wallet[1].address.to_str(
+    encrypted_mnemonic = fernet.encrypt(" ".join(mnemonic).encode()).decode()
+    return encrypted_mnemonic, address.to_str(
         is_user_friendly=True, is_bounceable=False
     )
+
+
+def get_wallet_executor() -> ProcessPoolExecutor:
+    global _executor
+    if _executor is None:
+        _executor = ProcessPoolExecutor(max_workers=wallet_generation_workers)
+    return _executor
+
+
+def shutdown_wallet_executor() -> None:
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+
+
+async def ton_generator_batch(count: int) -> list[tuple[str, str]]:
+    loop = asyncio.get_running_loop()
+    executor = get_wallet_executor()
+    return await asyncio.gather(
+        *(loop.run_in_executor(executor, ton_wallet) for _ in range(count))
+    )
+
+
+async def ton_generator():
+    return (await ton_generator_batch(1))[0]